@@ -5,6 +5,8 @@ class ClassSlots:
         timeslot (int): The time slot number.
         faculty (Faculty): The faculty member assigned to the slot (if any).
     """
+    __slots__ = ("classroom", "timeslot", "faculty")
+
     def __init__(self, classroom, timeslot):
         self.classroom = classroom
         self.timeslot = timeslot
@@ -18,5 +20,9 @@ class ClassSlots:
         self.faculty = faculty
         self.classroom.add_class_slots(self.timeslot, faculty)
 
+    def reset(self):
+        """ Frees the class slot so it can be reused for the next day."""
+        self.faculty = None
+
     def __str__(self):
         return f"{self.classroom}_P{self.timeslot}"
\ No newline at end of file
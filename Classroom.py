@@ -3,6 +3,8 @@ class Classroom:
     Attributes:
         class_name (str): The name of the classroom.
     """
+    __slots__ = ("class_name", "assigned_faculty", "class_slots")
+
     def __init__(self, class_name):
         self.class_name = class_name
         self.assigned_faculty = {}
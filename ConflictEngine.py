@@ -0,0 +1,112 @@
+class ConflictEngine:
+    """ Tracks which faculty members are already teaching in each timeslot of the current day.
+    Faculty members are mapped to integer ids and each id owns a small bitset of busy
+    timeslots, so checking or recording a conflict is a single bit operation.
+    `compile` turns the faculty-classroom relation into per-faculty tuples of classroom ids
+    once per run, so finding the slots a faculty member blocks needs no dict walks.
+    Attributes:
+        slots_per_day (int): The number of timeslots in a day.
+        faculty_ids (dict): Maps Faculty objects to their integer ids.
+        faculties (list): Faculty objects indexed by id.
+        busy (list): Busy-timeslot bitsets indexed by faculty id (bit 0 is timeslot 1).
+        classroom_ids (dict): Maps the compiled Classroom objects to their ids.
+        slot_table (list): ClassSlots lists indexed by classroom id.
+        classroom_table (list): Tuples of the classroom ids each faculty member teaches in, indexed by faculty id.
+    """
+    def __init__(self, faculties=(), slots_per_day=7):
+        self.slots_per_day = slots_per_day
+        self.faculty_ids = {}
+        self.faculties = []
+        self.busy = []
+        self.class_slots = None
+        self.classroom_ids = {}
+        self.slot_table = []
+        self.classroom_table = []
+        for faculty in faculties:
+            self.add_faculty(faculty)
+
+    def add_faculty(self, faculty):
+        """ Registers a faculty member and returns its integer id.
+        Args:
+            faculty (Faculty): The faculty member to register.
+        """
+        faculty_id = self.faculty_ids.get(faculty)
+        if faculty_id is None:
+            faculty_id = len(self.faculties)
+            self.faculty_ids[faculty] = faculty_id
+            self.faculties.append(faculty)
+            self.busy.append(0)
+            if self.class_slots is not None:
+                self.classroom_table.append(self._classrooms_of(faculty))
+        return faculty_id
+
+    def _classrooms_of(self, faculty):
+        return tuple(self.classroom_ids[classroom] for classroom in faculty.assigned_classes.keys()
+                     if classroom in self.classroom_ids)
+
+    def compile(self, class_slots):
+        """ Compiles the faculty-classroom relation of a run into index tables.
+        The relation does not change during a run, so this is done once instead of walking
+        `assigned_classes` after every allocation.
+        Args:
+            class_slots (dict): Dictionary mapping classrooms to lists of ClassSlots.
+        """
+        self.class_slots = class_slots
+        self.classroom_ids = {classroom: ind for ind, classroom in enumerate(class_slots.keys())}
+        self.slot_table = list(class_slots.values())
+        self.classroom_table = [self._classrooms_of(faculty) for faculty in self.faculties]
+
+    def blocked_slots(self, faculty_id, classroom_id, timeslot):
+        """ Returns the slots at `timeslot` in the faculty member's other classrooms, which a class in
+        `classroom_id` blocks. Requires `compile`."""
+        return [self.slot_table[other][timeslot - 1] for other in self.classroom_table[faculty_id] if other != classroom_id]
+
+    def is_busy(self, faculty, timeslot):
+        """ Checks if a faculty member is already teaching in the given timeslot today."""
+        faculty_id = self.faculty_ids.get(faculty)
+        if faculty_id is None:
+            return False
+        return self.busy[faculty_id] >> (timeslot - 1) & 1 == 1
+
+    def mark_busy(self, faculty, timeslot):
+        """ Records that a faculty member is teaching in the given timeslot today and returns its id."""
+        faculty_id = self.add_faculty(faculty)
+        self.busy[faculty_id] |= 1 << (timeslot - 1)
+        return faculty_id
+
+    def reset(self):
+        """ Clears all busy timeslots, ready for the next day."""
+        self.busy[:] = [0] * len(self.busy)
+
+    def add_edges(self, graph, class_slots):
+        """ Adds conflict edges for the day's allocations to a graph view of the schedule.
+        Every allocated slot is linked to the same timeslot in each of its faculty
+        member's other classrooms, matching the edges the scheduler used to insert.
+        Args:
+            graph (nx.Graph): Graph whose nodes are the ClassSlots in `class_slots`.
+            class_slots (dict): Dictionary mapping classrooms to lists of ClassSlots.
+        """
+        if self.class_slots is not class_slots:
+            self.compile(class_slots)
+        for class_slot in list(graph.nodes()):
+            if class_slot.faculty is None:
+                continue
+            faculty_id = self.add_faculty(class_slot.faculty)
+            classroom_id = self.classroom_ids[class_slot.classroom]
+            graph.add_edges_from((class_slot, other) for other in self.blocked_slots(faculty_id, classroom_id, class_slot.timeslot))
+        return graph
+
+    def to_graph(self, class_slots):
+        """ Builds a NetworkX graph of the day's slots and conflicts.
+        Args:
+            class_slots (dict): Dictionary mapping classrooms to lists of ClassSlots.
+
+        Returns:
+            nx.Graph: A graph with one node per slot and an edge per faculty conflict.
+        """
+        import networkx as nx
+
+        graph = nx.Graph()
+        for classroom in class_slots.keys():
+            graph.add_nodes_from(class_slots[classroom])
+        return self.add_edges(graph, class_slots)
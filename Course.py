@@ -5,6 +5,8 @@ class Course:
         code (str): The code of the course.
         course_hours (int): The number of class hours for the course.
     """
+    __slots__ = ("name", "code", "course_hours")
+
     def __init__(self, name, code, class_hours):
         self.name = name
         self.code = code
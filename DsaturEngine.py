@@ -0,0 +1,58 @@
+import heapq
+
+from SchedulerEngine import SchedulerEngine
+
+
+class DsaturEngine(SchedulerEngine):
+    """ Saturation-degree (DSATUR-style) engine.
+    Each day it repeatedly fills the open slot with the fewest faculty members still
+    able to take it, breaking ties by how many other classrooms its faculty also teach.
+    The slot goes to the faculty member with the most hours left in that classroom, so
+    the longest courses are packed first and the term needs fewer days. When seeded,
+    remaining ties are broken in a shuffled order.
+    """
+    name = "dsatur"
+
+    def options(self, class_slot, day):
+        """ Returns the faculty members that can take a slot today."""
+        return [
+            faculty for faculty in self.candidate_order(class_slot.classroom)
+            if self.is_valid(faculty, class_slot, day, self.faculty_schedule, self.conflicts)
+        ]
+
+    def fill_day(self, day):
+        order = {class_slot: ind for ind, class_slot in enumerate(self.slot_order())}
+        degree = {
+            classroom: sum(len(faculty.assigned_classes) - 1 for faculty in candidates)
+            for classroom, candidates in self.candidates.items()
+        }
+        saturation = {}
+        heap = []
+
+        def push(class_slot):
+            count = len(self.options(class_slot, day))
+            saturation[class_slot] = count
+            heapq.heappush(heap, (count, -degree[class_slot.classroom], order[class_slot], class_slot))
+
+        for class_slot in order:
+            push(class_slot)
+
+        while heap:
+            count, _, _, class_slot = heapq.heappop(heap)
+            if class_slot.faculty is not None or count != saturation[class_slot] or count == 0:
+                continue  # Already filled, stale entry, or nobody can teach it today
+            classroom = class_slot.classroom
+            faculty = max(
+                self.options(class_slot, day),
+                key=lambda faculty: (faculty.assigned_classes[classroom][1], faculty.remaining_hours)
+            )
+            self.allocate(class_slot, faculty, day)
+
+            # Only this classroom's slots (daily load) and the same timeslot in the
+            # faculty member's other classrooms (conflict) can lose options
+            affected = list(self.class_slots[classroom])
+            affected.extend(self.conflicts.blocked_slots(
+                self.conflicts.faculty_ids[faculty], self.conflicts.classroom_ids[classroom], class_slot.timeslot))
+            for other_slot in affected:
+                if other_slot.faculty is None:
+                    push(other_slot)
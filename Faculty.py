@@ -1,8 +1,16 @@
 class Faculty:
-    """ Represents a faculty member."""
+    """ Represents a faculty member.
+    Attributes:
+        name (str): The name of the faculty member.
+        assigned_classes (dict): Maps classrooms to [course, remaining hours].
+        remaining_hours (int): Total hours left across all assigned classes.
+    """
+    __slots__ = ("name", "assigned_classes", "remaining_hours")
+
     def __init__(self, name):
         self.name = name
         self.assigned_classes = {}
+        self.remaining_hours = 0
 
     def add_classes(self, classrooms):
         """ Assigns classrooms to the faculty member and updates the classroom's assigned faculty.
@@ -11,9 +19,31 @@ class Faculty:
             ["CSE_A object": [course object, course hours]]
         """
         classrooms = {classroom: [course, course.course_hours] for classroom, course in classrooms.items()}
+        for classroom, (course, hours) in classrooms.items():
+            if classroom in self.assigned_classes:
+                self.remaining_hours -= self.assigned_classes[classroom][1]
+            self.remaining_hours += hours
         self.assigned_classes.update(classrooms)
         for classroom, course in classrooms.items():
             classroom.add_faculty(self, course)
 
+    def reset_hours(self):
+        """ Restores every assigned class to its course's full hours, ready for a new run."""
+        for assignment in self.assigned_classes.values():
+            assignment[1] = assignment[0].course_hours
+        self.remaining_hours = sum(hours for _, hours in self.assigned_classes.values())
+
+    def teach(self, classroom):
+        """ Uses up one hour of the faculty member's class in a classroom.
+        Args:
+            classroom (Classroom): The classroom the hour is taught in.
+
+        Returns:
+            int: The hours left for that classroom.
+        """
+        self.assigned_classes[classroom][1] -= 1
+        self.remaining_hours -= 1
+        return self.assigned_classes[classroom][1]
+
     def __str__(self):
         return self.name
\ No newline at end of file
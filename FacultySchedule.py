@@ -0,0 +1,40 @@
+class FacultySchedule:
+    """ Tracks how many classes each faculty member teaches in each classroom per day.
+    Counters are updated as slots are allocated, so the daily-limit checks are O(1)
+    instead of rescanning every previous day. Days must be recorded in increasing order.
+    Attributes:
+        loads (dict): Maps (Faculty, Classroom) to [day, count that day, first day with two or more classes].
+    """
+    def __init__(self):
+        self.loads = {}
+
+    def record(self, faculty, classroom, day):
+        """ Records a class taught by a faculty member in a classroom on the given day.
+        Args:
+            faculty (Faculty): The faculty member teaching the class.
+            classroom (Classroom): The classroom the class is taught in.
+            day (int): The day the class is taught on.
+        """
+        load = self.loads.get((faculty, classroom))
+        if load is None:
+            self.loads[(faculty, classroom)] = [day, 1, None]
+            return
+        if load[0] == day:
+            load[1] += 1
+        else:
+            load[0] = day
+            load[1] = 1
+        if load[1] == 2 and load[2] is None:
+            load[2] = day
+
+    def count_today(self, faculty, classroom, day):
+        """ Returns the number of classes the faculty member teaches in the classroom on `day`."""
+        load = self.loads.get((faculty, classroom))
+        if load is None or load[0] != day:
+            return 0
+        return load[1]
+
+    def had_double_day(self, faculty, classroom, day):
+        """ Checks if the faculty member taught the classroom more than once on any day before `day`."""
+        load = self.loads.get((faculty, classroom))
+        return load is not None and load[2] is not None and load[2] < day
@@ -0,0 +1,15 @@
+from SchedulerEngine import SchedulerEngine
+
+
+class GreedyEngine(SchedulerEngine):
+    """ First-fit engine: walks the slots in graph order and gives each one to the
+    first assigned faculty member that can take it. When seeded, both orders are shuffled.
+    """
+    name = "greedy"
+
+    def fill_day(self, day):
+        for class_slot in self.slot_order():
+            for faculty in self.candidate_order(class_slot.classroom):
+                if self.is_valid(faculty, class_slot, day, self.faculty_schedule, self.conflicts):
+                    self.allocate(class_slot, faculty, day)
+                    break
@@ -0,0 +1,115 @@
+import sqlite3
+
+from Faculty import Faculty
+from Classroom import Classroom
+from Course import Course
+
+
+class SchedulerDB:
+    """ Data-access layer for scheduler.db.
+    Keeps one long-lived connection in WAL mode, so readers never block the writer,
+    and turns the tables into Classroom, Course and Faculty objects with dict lookups.
+    Attributes:
+        path (str): The database file.
+        conn (sqlite3.Connection): The open connection.
+    """
+    def __init__(self, path="scheduler.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.init_schema()
+
+    def init_schema(self):
+        """ Creates the tables and indexes, upgrading databases from older versions."""
+        with self.conn:
+            c = self.conn.cursor()
+            c.execute('''CREATE TABLE IF NOT EXISTS classrooms (class_name TEXT PRIMARY KEY)''')
+            c.execute('''CREATE TABLE IF NOT EXISTS courses (code TEXT PRIMARY KEY, name TEXT, hours INTEGER)''')
+            c.execute('''CREATE TABLE IF NOT EXISTS faculty (name TEXT PRIMARY KEY)''')
+            c.execute('''CREATE TABLE IF NOT EXISTS assignments (faculty_name TEXT, class_name TEXT, course_code TEXT,
+                        FOREIGN KEY(faculty_name) REFERENCES faculty(name),
+                        FOREIGN KEY(class_name) REFERENCES classrooms(class_name),
+                        FOREIGN KEY(course_code) REFERENCES courses(code))''')
+            # A faculty member teaches one course per classroom; keep the latest of any duplicates
+            c.execute('''DELETE FROM assignments WHERE rowid NOT IN
+                        (SELECT MAX(rowid) FROM assignments GROUP BY faculty_name, class_name)''')
+            c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS assignments_faculty_class
+                        ON assignments (faculty_name, class_name)''')
+            c.execute('''CREATE INDEX IF NOT EXISTS assignments_class ON assignments (class_name)''')
+            c.execute('''CREATE INDEX IF NOT EXISTS assignments_course ON assignments (course_code)''')
+
+    def load(self):
+        """
+        Loads every table into model objects.
+
+        Returns:
+            tuple: Dictionaries of classrooms, courses and faculty keyed by name, code and name,
+                in table order, with every assignment applied.
+        """
+        c = self.conn.cursor()
+        classrooms = {row[0]: Classroom(row[0]) for row in c.execute("SELECT class_name FROM classrooms")}
+        courses = {row[0]: Course(row[1], row[0], row[2]) for row in c.execute("SELECT code, name, hours FROM courses")}
+        faculties = {row[0]: Faculty(row[0]) for row in c.execute("SELECT name FROM faculty")}
+        for faculty_name, class_name, course_code in c.execute(
+                "SELECT faculty_name, class_name, course_code FROM assignments ORDER BY rowid"):
+            faculties[faculty_name].add_classes(classrooms={classrooms[class_name]: courses[course_code]})
+        return classrooms, courses, faculties
+
+    def add_classroom(self, class_name):
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO classrooms (class_name) VALUES (?)", (class_name,))
+
+    def add_course(self, code, name, hours):
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO courses (code, name, hours) VALUES (?, ?, ?)", (code, name, hours))
+
+    def add_faculty(self, name):
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO faculty (name) VALUES (?)", (name,))
+
+    def assign(self, faculty_name, class_name, course_code):
+        """ Assigns a faculty member to teach a course in a classroom, replacing any earlier course there."""
+        with self.conn:
+            self.conn.execute('''INSERT INTO assignments (faculty_name, class_name, course_code) VALUES (?, ?, ?)
+                                ON CONFLICT (faculty_name, class_name) DO UPDATE SET course_code = excluded.course_code''',
+                              (faculty_name, class_name, course_code))
+
+    def keys(self):
+        """ Returns sets of the classroom names, course codes and faculty names in the database."""
+        c = self.conn.cursor()
+        return ({row[0] for row in c.execute("SELECT class_name FROM classrooms")},
+                {row[0] for row in c.execute("SELECT code FROM courses")},
+                {row[0] for row in c.execute("SELECT name FROM faculty")})
+
+    def bulk_insert(self, classrooms=(), courses=(), faculty=(), assignments=()):
+        """
+        Inserts many rows in one transaction, with the same conflict handling as the single-row methods.
+
+        Args:
+            classrooms (list): (class_name,) rows.
+            courses (list): (code, name, hours) rows.
+            faculty (list): (name,) rows.
+            assignments (list): (faculty_name, class_name, course_code) rows.
+        """
+        with self.conn:
+            c = self.conn.cursor()
+            c.executemany("INSERT OR IGNORE INTO classrooms (class_name) VALUES (?)", classrooms)
+            c.executemany("INSERT OR IGNORE INTO courses (code, name, hours) VALUES (?, ?, ?)", courses)
+            c.executemany("INSERT OR IGNORE INTO faculty (name) VALUES (?)", faculty)
+            c.executemany('''INSERT INTO assignments (faculty_name, class_name, course_code) VALUES (?, ?, ?)
+                            ON CONFLICT (faculty_name, class_name) DO UPDATE SET course_code = excluded.course_code''',
+                          assignments)
+
+    def clear(self):
+        """ Deletes every row from every table."""
+        with self.conn:
+            c = self.conn.cursor()
+            c.execute("DELETE FROM assignments")
+            c.execute("DELETE FROM faculty")
+            c.execute("DELETE FROM courses")
+            c.execute("DELETE FROM classrooms")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,190 @@
+import random
+import time
+
+import numpy as np
+
+from ConflictEngine import ConflictEngine
+from SlotGrid import SlotGrid
+from TimetableResult import TimetableResult
+from simple_scheduler import save_graph, save_graph_snapshot, graph_snapshot, is_valid_slot_for_faculty
+from visualize import node_positions, classroom_pairs
+
+
+class EngineReport:
+    """ Summarises a scheduling run so engines can be compared.
+    Attributes:
+        engine (str): The name of the engine that produced the timetable.
+        days (int): The number of days the timetable uses.
+        free_slots (int): The number of slots left free across all days.
+        runtime (float): Wall-clock seconds spent scheduling.
+    """
+    __slots__ = ("engine", "days", "free_slots", "runtime")
+
+    def __init__(self, engine, days, free_slots, runtime):
+        self.engine = engine
+        self.days = days
+        self.free_slots = free_slots
+        self.runtime = runtime
+
+    def __str__(self):
+        return f"{self.engine}: {self.days} days, {self.free_slots} free slots, {self.runtime:.3f}s"
+
+
+class SchedulerEngine:
+    """ Base class for scheduling engines.
+    The base class runs the term day by day and keeps the shared state (conflicts,
+    daily loads, remaining hours and the day's slot grid). Subclasses decide which
+    faculty member fills which slot by implementing `fill_day`.
+    Attributes:
+        name (str): The name the engine is registered under.
+        seed (int): Seed for randomised slot and faculty orders, or None for the default order.
+        report (EngineReport): The summary of the last run.
+        is_valid (function): The validity check used by `fill_day`, with the signature of
+            `is_valid_slot_for_faculty`; replaced by a counting version when metrics are collected.
+    """
+    name = None
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.report = None
+
+    def schedule(self, G, class_slots, faculties, faculty_schedule, render=False, render_pool=None, metrics=None):
+        """
+        Generates a timetable based on the provided data structures.
+
+        Args:
+            G (nx.Graph): The graph of the day's slots, rebuilt from the conflict engine each day.
+            class_slots (dict): Dictionary mapping classrooms to lists of ClassSlots.
+            faculties (list): List of Faculty objects, including every faculty member assigned to a classroom.
+            faculty_schedule (FacultySchedule): Tracks faculty classes per classroom per day.
+            render (bool): Whether to save a graph_day_N.png image of each day's graph.
+            render_pool (Executor): Optional process pool that draws the images in the background;
+                the run waits for them before returning and raises their errors.
+            metrics (SchedulerObserver): Optional observer, e.g. SchedulerMetrics for per-day timings and
+                validity-check counts.
+
+        Returns:
+            TimetableResult: The timetable as faculty and course id grids.
+        """
+        start = time.perf_counter()
+        self.is_valid = is_valid_slot_for_faculty if metrics is None else metrics.validity_check()
+        self.rng = random.Random(self.seed) if self.seed is not None else None
+        self.G = G
+        self.class_slots = class_slots
+        self.faculty_schedule = faculty_schedule
+        self.conflicts = ConflictEngine(faculties)
+        self.conflicts.compile(class_slots)
+        self.grid = SlotGrid(class_slots.keys())
+        self.course_ids = {}
+        self.hours_left = sum(faculty.remaining_hours for faculty in faculties)
+        # Faculty members that still have hours in each classroom, in assignment order
+        self.candidates = {
+            classroom: [faculty for faculty in classroom.assigned_faculty.keys() if faculty.assigned_classes[classroom][1] > 0]
+            for classroom in class_slots.keys()
+        }
+
+        if metrics is not None:
+            metrics.run_started(self, faculties)
+
+        clock = time.perf_counter
+        day_cells = []
+        day_courses = []
+        positions = None
+        renders = []
+        day = 1
+        while self.hours_left > 0:
+            hours_before = self.hours_left
+            marks = [clock()]
+            self.fill_day(day)
+            marks.append(clock())
+
+            # Keep a copy of this day's grid
+            cells, course_cells = self.grid.snapshot()
+            day_cells.append(cells)
+            day_courses.append(course_cells)
+            marks.append(clock())
+
+            # Reset for next day
+            if render:
+                self.conflicts.add_edges(G, class_slots)
+                if positions is None:
+                    # The slot nodes are the same every day, so they are laid out once per run
+                    class_names = [classroom.class_name for classroom in class_slots.keys()]
+                    positions = node_positions(class_names, self.grid.slots_per_day,
+                                               classroom_pairs(self.conflicts.classroom_table))
+                marks.append(clock())
+                if render_pool is None:
+                    save_graph(G, day, positions)
+                else:
+                    renders.append(render_pool.submit(save_graph_snapshot, *graph_snapshot(G), day, positions))
+                G.remove_edges_from(list(G.edges()))
+                marks.append(clock())
+            self.conflicts.reset()
+            self.grid.reset()
+            for classroom in class_slots.keys():
+                for class_slot in class_slots[classroom]:
+                    class_slot.reset()
+            if metrics is not None:
+                marks.append(clock())
+                phases = ("fill", "snapshot", "edges", "render", "reset") if render else ("fill", "snapshot", "reset")
+                timings = {phase: end - begin for phase, begin, end in zip(phases, marks, marks[1:])}
+                metrics.day_finished(self, day, hours_before - self.hours_left, timings, cells, course_cells)
+            day += 1
+        # Raise the errors of background renders, as drawing in this process would
+        for future in renders:
+            future.result()
+
+        result_start = clock()
+        shape = (len(day_cells), len(self.grid.classrooms), self.grid.slots_per_day)
+        courses = list(self.course_ids)
+        timetable = TimetableResult(
+            np.array(day_cells, dtype=np.int32).reshape(shape),
+            np.array(day_courses, dtype=np.int32).reshape(shape),
+            [classroom.class_name for classroom in self.grid.classrooms],
+            [faculty.name for faculty in self.conflicts.faculties],
+            [course.code for course in courses],
+            [course.name for course in courses],
+        )
+        self.report = EngineReport(self.name, timetable.days, timetable.free_slots, time.perf_counter() - start)
+        if metrics is not None:
+            metrics.run_finished(self, timetable, self.report, clock() - result_start)
+        return timetable
+
+    def allocate(self, class_slot, faculty, day):
+        """ Allocates a faculty member to a slot and updates the run's bookkeeping.
+        Args:
+            class_slot (ClassSlots): The slot being filled.
+            faculty (Faculty): The faculty member teaching it.
+            day (int): The current day.
+        """
+        class_slot.allocate(faculty)
+        if faculty.teach(class_slot.classroom) == 0:
+            self.candidates[class_slot.classroom].remove(faculty)
+        self.hours_left -= 1
+        self.faculty_schedule.record(faculty, class_slot.classroom, day)
+        faculty_id = self.conflicts.mark_busy(faculty, class_slot.timeslot)
+        course = faculty.assigned_classes[class_slot.classroom][0]
+        course_id = self.course_ids.setdefault(course, len(self.course_ids))
+        self.grid.allocate(class_slot.classroom, class_slot.timeslot, faculty_id, course_id)
+
+    def slot_order(self):
+        """ Returns the slots in the order they should be considered, shuffled when seeded."""
+        slots = list(self.G.nodes())
+        if self.rng is not None:
+            self.rng.shuffle(slots)
+        return slots
+
+    def candidate_order(self, classroom):
+        """ Returns the faculty members with hours left in a classroom, shuffled when seeded."""
+        if self.rng is None:
+            return self.candidates[classroom]
+        candidates = list(self.candidates[classroom])
+        self.rng.shuffle(candidates)
+        return candidates
+
+    def fill_day(self, day):
+        """ Fills the slots of one day by calling `allocate`.
+        Args:
+            day (int): The day being scheduled.
+        """
+        raise NotImplementedError
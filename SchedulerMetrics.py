@@ -0,0 +1,111 @@
+import time
+
+from simple_scheduler import is_valid_slot_for_faculty, rejection_reason
+
+RULES = ("daily_cap", "double_day", "hours_exhausted", "conflict")
+
+
+class SchedulingCancelled(Exception):
+    """ Raised from an observer hook to stop a run early."""
+
+
+class SchedulerObserver:
+    """ Base class for objects passed to `generate_timetable(..., metrics=...)`.
+    The engine calls the hooks as the run goes; they do nothing here. Raising
+    SchedulingCancelled from a hook stops the run.
+    """
+    def validity_check(self):
+        """ Returns the validity check the engine should use, with the signature of `is_valid_slot_for_faculty`."""
+        return is_valid_slot_for_faculty
+
+    def run_started(self, engine, faculties):
+        """ Called before the first day with the engine and the faculty being scheduled."""
+
+    def day_finished(self, engine, day, allocations, timings, cells, course_cells):
+        """
+        Called after each day.
+
+        Args:
+            engine (SchedulerEngine): The running engine.
+            day (int): The day number, from 1.
+            allocations (int): Slots filled on the day.
+            timings (dict): Seconds spent in each phase of the day.
+            cells (array): The day's faculty ids, flattened classrooms x slots (see SlotGrid).
+            course_cells (array): The day's course ids, like `cells`.
+        """
+
+    def run_finished(self, engine, timetable, report, result_time):
+        """ Called once the TimetableResult is built; `result_time` is the seconds spent building it."""
+
+
+class SchedulerMetrics(SchedulerObserver):
+    """ Observer that collects instrumentation from a scheduling run.
+    Pass one to `generate_timetable(..., metrics=...)`. Without it the engines call the
+    plain validity check and nothing is counted.
+    Attributes:
+        checks (int): Validity checks made.
+        rejections (dict): Rejected checks by rule, see `RULES`.
+        check_time (float): Seconds spent in validity checks (included in the "fill" phase).
+        allocations (int): Slots filled.
+        days (list): Per-day dicts of the day number, allocations and phase timings.
+        phases (dict): Total seconds per phase: fill, snapshot, edges, render, reset and result.
+    """
+    def __init__(self):
+        self.checks = 0
+        self.rejections = {rule: 0 for rule in RULES}
+        self.check_time = 0.0
+        self.allocations = 0
+        self.days = []
+        self.phases = {}
+        self.engine = None
+        self.runtime = 0.0
+
+    def validity_check(self):
+        """ Returns a drop-in replacement for `is_valid_slot_for_faculty` that counts checks and rejections."""
+        clock = time.perf_counter
+        rejections = self.rejections
+
+        def check(faculty, class_slot, day, faculty_schedule, conflicts):
+            start = clock()
+            reason = rejection_reason(faculty, class_slot, day, faculty_schedule, conflicts)
+            self.check_time += clock() - start
+            self.checks += 1
+            if reason is None:
+                return True
+            rejections[reason] += 1
+            return False
+
+        return check
+
+    def run_started(self, engine, faculties):
+        self.engine = engine.name
+
+    def day_finished(self, engine, day, allocations, timings, cells, course_cells):
+        self.allocations += allocations
+        self.days.append({"day": day, "allocations": allocations, "seconds": timings})
+        for phase, seconds in timings.items():
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def run_finished(self, engine, timetable, report, result_time):
+        self.phases["result"] = self.phases.get("result", 0.0) + result_time
+        self.runtime = report.runtime
+
+    def summary(self):
+        """ Returns the collected metrics as a dict of plain values, e.g. for JSON output."""
+        return {
+            "engine": self.engine,
+            "runtime": self.runtime,
+            "days": len(self.days),
+            "allocations": self.allocations,
+            "checks": self.checks,
+            "rejections": dict(self.rejections),
+            "check_time": self.check_time,
+            "phases": dict(self.phases),
+            "per_day": list(self.days),
+        }
+
+    def __str__(self):
+        rejected = ", ".join(f"{rule} {count}" for rule, count in self.rejections.items())
+        phases = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in self.phases.items())
+        return (f"{self.engine}: {len(self.days)} days, {self.allocations} allocations, {self.checks} checks "
+                f"({self.check_time:.3f}s); rejected: {rejected}; phases: {phases}")
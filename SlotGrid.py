@@ -0,0 +1,45 @@
+from array import array
+
+FREE = -1
+
+
+class SlotGrid:
+    """ A compact grid of the faculty ids allocated to every classroom slot of a day.
+    The grid is a single preallocated integer array that is reset in place between
+    days, so scheduling a long term does not allocate new slot objects every day.
+    Attributes:
+        classrooms (list): Classroom objects indexed by classroom id.
+        classroom_ids (dict): Maps Classroom objects to their ids.
+        slots_per_day (int): The number of timeslots in a day.
+        cells (array): Faculty ids by classroom id and timeslot, FREE for empty slots.
+        course_cells (array): Course ids of the same slots, FREE for empty slots.
+    """
+    __slots__ = ("classrooms", "classroom_ids", "slots_per_day", "cells", "course_cells", "_free")
+
+    def __init__(self, classrooms, slots_per_day=7):
+        self.classrooms = list(classrooms)
+        self.classroom_ids = {classroom: ind for ind, classroom in enumerate(self.classrooms)}
+        self.slots_per_day = slots_per_day
+        self._free = array('i', [FREE]) * (len(self.classrooms) * slots_per_day)
+        self.cells = array('i', self._free)
+        self.course_cells = array('i', self._free)
+
+    def allocate(self, classroom, timeslot, faculty_id, course_id=FREE):
+        """ Records a faculty id (and course id) in a classroom's timeslot (timeslots start at 1)."""
+        ind = self.classroom_ids[classroom] * self.slots_per_day + timeslot - 1
+        self.cells[ind] = faculty_id
+        self.course_cells[ind] = course_id
+
+    def row(self, classroom_id):
+        """ Returns the faculty ids of a classroom's slots for the day."""
+        start = classroom_id * self.slots_per_day
+        return self.cells[start:start + self.slots_per_day]
+
+    def snapshot(self):
+        """ Returns copies of the day's faculty and course cells."""
+        return array('i', self.cells), array('i', self.course_cells)
+
+    def reset(self):
+        """ Frees every slot, ready for the next day."""
+        self.cells[:] = self._free
+        self.course_cells[:] = self._free
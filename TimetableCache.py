@@ -0,0 +1,134 @@
+import hashlib
+import io
+import json
+import time
+
+import numpy as np
+
+from SchedulerEngine import EngineReport
+from TimetableResult import TimetableResult
+
+# Bump when engine changes alter the timetables generated for the same data
+CACHE_VERSION = 1
+
+
+class TimetableCache:
+    """ Generated timetables stored in the database, keyed by a hash of their inputs.
+    The key covers the classrooms, faculty, assignments and course hours in scheduling
+    order, plus the engine settings, so unchanged data returns the stored timetable
+    instead of running the engine again. The least recently used entries beyond
+    `max_entries` are evicted.
+    Attributes:
+        conn (sqlite3.Connection): The database connection, e.g. `SchedulerDB.conn`.
+        max_entries (int): The number of timetables kept.
+        hits (int): Lookups answered from the cache by this instance.
+        misses (int): Lookups that found nothing.
+    """
+    def __init__(self, conn, max_entries=32):
+        self.conn = conn
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS timetable_cache (key TEXT PRIMARY KEY, settings TEXT,
+                                names TEXT, grids BLOB, engine TEXT, days INTEGER, free_slots INTEGER, runtime REAL,
+                                created REAL, last_used REAL, hits INTEGER DEFAULT 0)''')
+            self.conn.execute('''CREATE INDEX IF NOT EXISTS timetable_cache_last_used ON timetable_cache (last_used)''')
+
+    @staticmethod
+    def key(classrooms, faculties, engine="greedy", seed=None, slots_per_day=7):
+        """
+        Hashes the scheduling inputs.
+        Only names, codes and hours are used, so the same data loaded again gives the same key.
+        Order is kept because the engines assign in input order: the faculty list, each member's
+        classes and each classroom's faculty, which is the order candidates are tried in.
+
+        Args:
+            classrooms (list): The Classroom objects to schedule.
+            faculties (list): The Faculty objects with their assigned classes.
+            engine (str): The engine name.
+            seed (int): The engine seed, or None.
+            slots_per_day (int): The number of slots per day.
+
+        Returns:
+            str: A hex SHA-256 digest.
+        """
+        data = {
+            "version": CACHE_VERSION,
+            "settings": [engine, seed, slots_per_day],
+            "classrooms": [[classroom.class_name, [faculty.name for faculty in classroom.assigned_faculty]]
+                           for classroom in classrooms],
+            "faculty": [
+                [faculty.name, [[classroom.class_name, course.code, course.name, course.course_hours]
+                                for classroom, (course, _) in faculty.assigned_classes.items()]]
+                for faculty in faculties
+            ],
+        }
+        return hashlib.sha256(json.dumps(data, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a timetable.
+
+        Returns:
+            tuple: The TimetableResult and the EngineReport of the run that generated it, or None on a miss.
+        """
+        row = self.conn.execute("SELECT names, grids, engine, days, free_slots, runtime FROM timetable_cache WHERE key=?",
+                                (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self.conn:
+            self.conn.execute("UPDATE timetable_cache SET last_used=?, hits=hits+1 WHERE key=?", (time.time(), key))
+        names, grids, engine, days, free_slots, runtime = row
+        arrays = np.load(io.BytesIO(grids))
+        names = json.loads(names)
+        timetable = TimetableResult(arrays["cells"], arrays["course_cells"], names["class_names"],
+                                    names["faculty_names"], names["course_codes"], names["course_names"])
+        return timetable, EngineReport(engine, days, free_slots, runtime)
+
+    def put(self, key, timetable, report, settings=None):
+        """
+        Stores a timetable and evicts the least recently used entries beyond `max_entries`.
+
+        Args:
+            key (str): The key from `TimetableCache.key`.
+            timetable (TimetableResult): The generated timetable.
+            report (EngineReport): The report of the run.
+            settings (str): Optional description of the settings, for inspection.
+        """
+        grids = io.BytesIO()
+        np.savez_compressed(grids, cells=timetable.cells, course_cells=timetable.course_cells)
+        names = json.dumps({
+            "class_names": timetable.class_names,
+            "faculty_names": timetable.faculty_names,
+            "course_codes": timetable.course_codes,
+            "course_names": timetable.course_names,
+        })
+        now = time.time()
+        with self.conn:
+            self.conn.execute('''INSERT OR REPLACE INTO timetable_cache
+                                (key, settings, names, grids, engine, days, free_slots, runtime, created, last_used)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                              (key, settings, names, grids.getvalue(), report.engine, report.days,
+                               report.free_slots, report.runtime, now, now))
+            self.conn.execute('''DELETE FROM timetable_cache WHERE key NOT IN
+                                (SELECT key FROM timetable_cache ORDER BY last_used DESC LIMIT ?)''', (self.max_entries,))
+
+    def stats(self):
+        """ Returns the hits and misses of this instance and the number of stored entries."""
+        entries = self.conn.execute("SELECT COUNT(*) FROM timetable_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        """ Deletes every stored timetable."""
+        with self.conn:
+            self.conn.execute("DELETE FROM timetable_cache")
@@ -0,0 +1,157 @@
+import numpy as np
+
+from SlotGrid import FREE
+
+
+class TimetableResult:
+    """ A generated timetable stored as compact integer grids.
+    `cells[day, classroom, slot]` holds the id of the faculty member teaching that slot
+    (FREE for free slots) and `course_cells` the id of the course taught. Ids index the
+    lookup tables. Text, PDF and GUI output are derived from the grids; iterating the
+    result still yields the old "Day N" / "CLASS: name, free, ..." string lists.
+    Attributes:
+        cells (np.ndarray): Faculty ids, shaped days x classrooms x slots.
+        course_cells (np.ndarray): Course ids, shaped like `cells`.
+        class_names (list): Classroom names indexed by classroom id.
+        faculty_names (list): Faculty names indexed by faculty id.
+        course_codes (list): Course codes indexed by course id.
+        course_names (list): Course names indexed by course id.
+    """
+    __slots__ = ("cells", "course_cells", "class_names", "faculty_names", "course_codes", "course_names",
+                 "_classroom_ids", "_faculty_ids", "_faculty_index")
+
+    def __init__(self, cells, course_cells, class_names, faculty_names, course_codes=(), course_names=()):
+        self.cells = np.asarray(cells, dtype=np.int32)
+        self.course_cells = np.asarray(course_cells, dtype=np.int32)
+        self.class_names = list(class_names)
+        self.faculty_names = list(faculty_names)
+        self.course_codes = list(course_codes)
+        self.course_names = list(course_names)
+        self._classroom_ids = None
+        self._faculty_ids = None
+        self._faculty_index = None
+
+    @classmethod
+    def from_strings(cls, timetable):
+        """
+        Builds a result from the string format returned by older versions of `generate_timetable`.
+        Course ids are unknown in that format and are left FREE.
+
+        Args:
+            timetable (list): A list of daily schedules, where each schedule is a list of strings.
+        """
+        class_names = [line.split(": ", 1)[0] for line in timetable[0][1:]] if timetable else []
+        faculty_ids = {}
+        rows = []
+        for day_schedule in timetable:
+            day = []
+            for line in day_schedule[1:]:
+                slots = line.split(": ", 1)[1].split(", ")
+                day.append([FREE if name == 'free' else faculty_ids.setdefault(name, len(faculty_ids)) for name in slots])
+            rows.append(day)
+        cells = np.array(rows, dtype=np.int32).reshape(len(rows), len(class_names), -1 if rows else 7)
+        return cls(cells, np.full_like(cells, FREE), class_names, list(faculty_ids))
+
+    @property
+    def days(self):
+        """ The number of days in the timetable."""
+        return self.cells.shape[0]
+
+    @property
+    def slots_per_day(self):
+        return self.cells.shape[2]
+
+    @property
+    def free_slots(self):
+        """ The number of free slots across all days."""
+        return int(np.count_nonzero(self.cells == FREE))
+
+    def classroom_id(self, classroom):
+        """ Returns the id of a classroom, given its id, name or Classroom object."""
+        if isinstance(classroom, (int, np.integer)):
+            return int(classroom)
+        if self._classroom_ids is None:
+            self._classroom_ids = {name: ind for ind, name in enumerate(self.class_names)}
+        return self._classroom_ids[getattr(classroom, "class_name", classroom)]
+
+    def faculty_id(self, faculty):
+        """ Returns the id of a faculty member, given its id, name or Faculty object."""
+        if isinstance(faculty, (int, np.integer)):
+            return int(faculty)
+        if self._faculty_ids is None:
+            self._faculty_ids = {name: ind for ind, name in enumerate(self.faculty_names)}
+        return self._faculty_ids[getattr(faculty, "name", faculty)]
+
+    def day_cells(self, day):
+        """ Returns a classrooms x slots view of one day's faculty ids (no copy)."""
+        return self.cells[day]
+
+    def classroom_view(self, classroom):
+        """ Returns a days x slots view of a classroom's faculty ids (no copy)."""
+        return self.cells[:, self.classroom_id(classroom), :]
+
+    def course_view(self, classroom):
+        """ Returns a days x slots view of a classroom's course ids (no copy)."""
+        return self.course_cells[:, self.classroom_id(classroom), :]
+
+    def courses_at(self, days, classroom_ids, slots):
+        """ Returns the course ids at matching arrays of days, classroom ids and slots, e.g. from `faculty_view`."""
+        return self.course_cells[days, classroom_ids, slots]
+
+    def classroom_rows(self, classroom):
+        """ Returns a classroom's faculty names per day, with 'free' for free slots."""
+        names = self._name_table()
+        return names[self.classroom_view(classroom)].tolist()
+
+    def faculty_view(self, faculty):
+        """
+        Returns where a faculty member teaches.
+
+        Returns:
+            np.ndarray: Rows of (day, classroom id, slot), in day order.
+        """
+        if self._faculty_index is None:
+            # Sort the flat grid once so every faculty lookup is a slice
+            flat = self.cells.ravel()
+            order = np.argsort(flat, kind="stable")
+            bounds = np.searchsorted(flat[order], np.arange(len(self.faculty_names) + 1))
+            self._faculty_index = (order, bounds)
+        order, bounds = self._faculty_index
+        faculty_id = self.faculty_id(faculty)
+        positions = order[bounds[faculty_id]:bounds[faculty_id + 1]]
+        return np.column_stack(np.unravel_index(positions, self.cells.shape))
+
+    def course_of(self, day, classroom, slot):
+        """ Returns the code of the course taught in a slot, or None if it is free or unknown."""
+        course_id = self.course_cells[day, self.classroom_id(classroom), slot]
+        return self.course_codes[course_id] if course_id != FREE else None
+
+    def _name_table(self):
+        # Index -1 (FREE) picks the trailing 'free'
+        return np.array(self.faculty_names + ['free'], dtype=object)
+
+    def day_strings(self, day, names=None):
+        """ Returns one day in the "Day N" / "CLASS: name, free, ..." string format."""
+        names = self._name_table() if names is None else names
+        day_schedule = [f"Day {day + 1}"]
+        for class_name, row in zip(self.class_names, names[self.cells[day]].tolist()):
+            day_schedule.append(f"{class_name}: {', '.join(row)}")
+        return day_schedule
+
+    def to_strings(self):
+        """ Returns the whole timetable in the string format of older versions."""
+        names = self._name_table()
+        return [self.day_strings(day, names) for day in range(self.days)]
+
+    def __len__(self):
+        return self.days
+
+    def __getitem__(self, day):
+        if isinstance(day, slice):
+            return [self.day_strings(ind) for ind in range(self.days)[day]]
+        return self.day_strings(range(self.days)[day])
+
+    def __iter__(self):
+        names = self._name_table()
+        for day in range(self.days):
+            yield self.day_strings(day, names)
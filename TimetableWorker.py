@@ -0,0 +1,98 @@
+import queue
+import threading
+
+from FacultySchedule import FacultySchedule
+from SchedulerMetrics import SchedulerObserver, SchedulerMetrics, SchedulingCancelled
+from profiling import profiled, top_functions
+from simple_scheduler import create_slots, generate_timetable
+from engines import get_engine
+from serialize import dump_models, load_models
+
+
+class ProgressObserver(SchedulerObserver):
+    """ Reports each finished day to a queue and stops the run when cancelled.
+    Attributes:
+        events (queue.Queue): Where ("day", ...) events are put.
+        cancelled (threading.Event): Set to stop the run after the current day.
+        metrics (SchedulerMetrics): Optional metrics collected alongside, or None.
+        total_hours (int): Hours to place in the run.
+        placed (int): Hours placed so far.
+    """
+    def __init__(self, events, cancelled, metrics=None):
+        self.events = events
+        self.cancelled = cancelled
+        self.metrics = metrics
+        self.total_hours = 0
+        self.placed = 0
+
+    def validity_check(self):
+        return self.metrics.validity_check() if self.metrics else super().validity_check()
+
+    def run_started(self, engine, faculties):
+        self.total_hours = sum(faculty.remaining_hours for faculty in faculties)
+        if self.metrics:
+            self.metrics.run_started(engine, faculties)
+        if self.cancelled.is_set():
+            raise SchedulingCancelled()
+
+    def day_finished(self, engine, day, allocations, timings, cells, course_cells):
+        if self.metrics:
+            self.metrics.day_finished(engine, day, allocations, timings, cells, course_cells)
+        self.placed += allocations
+        names = [faculty.name for faculty in engine.conflicts.faculties] + ['free']
+        slots = engine.grid.slots_per_day
+        lines = [f"Day {day}"]
+        for ind, classroom in enumerate(engine.grid.classrooms):
+            row = cells[ind * slots:(ind + 1) * slots]
+            lines.append(f"{classroom.class_name}: {', '.join(names[faculty_id] for faculty_id in row)}")
+        self.events.put(("day", day, lines, self.placed, self.total_hours))
+        if self.cancelled.is_set():
+            raise SchedulingCancelled()
+
+    def run_finished(self, engine, timetable, report, result_time):
+        if self.metrics:
+            self.metrics.run_finished(engine, timetable, report, result_time)
+
+
+class TimetableWorker(threading.Thread):
+    """ Generates a timetable on a background thread so the GUI stays responsive.
+    The classrooms and faculty are copied when the worker is created, so the caller
+    may keep editing its own objects during the run. Progress arrives on `events`:
+        ("day", day, lines, hours placed, total hours) after each day,
+        ("done", timetable, report, profile text or None) when finished,
+        ("cancelled",) after `cancel()`, or ("error", message).
+    Attributes:
+        events (queue.Queue): The progress events, read by the GUI thread.
+        engine_name (str): The engine to run.
+        profile_path (str): Optional file for cProfile stats; metrics are collected too.
+    """
+    def __init__(self, classrooms, faculties, engine_name, profile_path=None):
+        super().__init__(daemon=True)
+        self.data = dump_models(classrooms, faculties)
+        self.engine_name = engine_name
+        self.profile_path = profile_path
+        self.events = queue.Queue()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        """ Asks the run to stop after the day in progress."""
+        self.cancelled.set()
+
+    def run(self):
+        classrooms, faculties = load_models(self.data)
+        metrics = SchedulerMetrics() if self.profile_path else None
+        observer = ProgressObserver(self.events, self.cancelled, metrics)
+        try:
+            with profiled(self.profile_path, enabled=self.profile_path is not None) as profile:
+                G, class_slots = create_slots(classrooms)
+                engine = get_engine(self.engine_name)
+                timetable = generate_timetable(G, class_slots, faculties, FacultySchedule(), engine=engine,
+                                               metrics=observer)
+        except SchedulingCancelled:
+            self.events.put(("cancelled",))
+            return
+        except Exception as error:
+            self.events.put(("error", f"{type(error).__name__}: {error}"))
+            return
+        profile_text = f"{metrics}\n{top_functions(profile)}" if profile is not None else None
+        self.events.put(("done", timetable, engine.report, profile_text))
@@ -0,0 +1,156 @@
+import numpy as np
+
+from SchedulerEngine import SchedulerEngine
+from SlotGrid import FREE
+
+
+class VectorEngine(SchedulerEngine):
+    """ Greedy engine that evaluates the validity rules on NumPy arrays.
+    Every faculty/classroom assignment is a row in flat arrays of remaining hours,
+    today's count and first double day, and faculty availability is a faculty x timeslot
+    boolean array. Classrooms are grouped into levels that share no faculty and come after
+    every earlier classroom they share faculty with, so a whole level is filled one
+    timeslot at a time with a single mask over all its candidates. Without a seed the
+    timetable is identical to GreedyEngine's.
+
+    With a seed, the classroom order and each classroom's faculty order are shuffled once
+    per run (GreedyEngine reshuffles per slot), so seeded runs differ from GreedyEngine's.
+    The faculty schedule passed to `schedule` is not updated, and metrics observers receive
+    day timings and allocations but no per-check counts.
+    """
+    name = "vector"
+
+    def schedule(self, G, class_slots, faculties, faculty_schedule, render=False, render_pool=None, metrics=None):
+        self.render = render
+        self.prepared = False
+        timetable = super().schedule(G, class_slots, faculties, faculty_schedule, render=render,
+                                     render_pool=render_pool, metrics=metrics)
+        # Leave the faculty with their hours used, as the other engines do
+        for pair, (faculty, classroom) in enumerate(self.pairs):
+            used = faculty.assigned_classes[classroom][1] - int(self.hours[pair])
+            faculty.assigned_classes[classroom][1] -= used
+            faculty.remaining_hours -= used
+        return timetable
+
+    def prepare(self):
+        """ Builds the assignment arrays and the classroom levels for the run."""
+        classrooms = self.grid.classrooms
+        order = list(range(len(classrooms)))
+        if self.rng is not None:
+            self.rng.shuffle(order)
+
+        self.pairs = []
+        faculty_index = {}
+        course_index = {}
+        self.faculty_list = []
+        self.course_list = []
+        candidates = [[] for _ in classrooms]
+        for classroom_id in order:
+            classroom = classrooms[classroom_id]
+            room_candidates = list(self.candidates[classroom])
+            if self.rng is not None:
+                self.rng.shuffle(room_candidates)
+            for faculty in room_candidates:
+                if faculty not in faculty_index:
+                    faculty_index[faculty] = len(self.faculty_list)
+                    self.faculty_list.append(faculty)
+                course = faculty.assigned_classes[classroom][0]
+                if course not in course_index:
+                    course_index[course] = len(self.course_list)
+                    self.course_list.append(course)
+                candidates[classroom_id].append(len(self.pairs))
+                self.pairs.append((faculty, classroom))
+
+        # One extra pair and faculty row pad the candidate table; the pad pair never has hours
+        pad = len(self.pairs)
+        self.pair_faculty = np.array([faculty_index[faculty] for faculty, _ in self.pairs] + [len(self.faculty_list)], dtype=np.int64)
+        self.pair_course = np.array(
+            [course_index[faculty.assigned_classes[classroom][0]] for faculty, classroom in self.pairs] + [0], dtype=np.int64)
+        self.hours = np.array([faculty.assigned_classes[classroom][1] for faculty, classroom in self.pairs] + [0], dtype=np.int32)
+        self.counts = np.zeros(pad + 1, dtype=np.int8)
+        self.first_double = np.zeros(pad + 1, dtype=np.int32)
+        self.busy = np.zeros((len(self.faculty_list) + 1, self.grid.slots_per_day), dtype=bool)
+        width = max((len(room) for room in candidates), default=0) or 1
+        self.table = np.full((len(classrooms), width), pad, dtype=np.int64)
+        for classroom_id, room in enumerate(candidates):
+            self.table[classroom_id, :len(room)] = room
+
+        # A classroom's level is one more than that of any earlier classroom sharing its faculty
+        last_level = {}
+        levels = []
+        for classroom_id in order:
+            faculty_ids = self.pair_faculty[candidates[classroom_id]].tolist()
+            level = 1 + max((last_level[faculty_id] for faculty_id in faculty_ids if faculty_id in last_level), default=-1)
+            for faculty_id in faculty_ids:
+                last_level[faculty_id] = level
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(classroom_id)
+        self.levels = [np.array(level, dtype=np.int64) for level in levels]
+        self.level_tables = [self.table[level] for level in self.levels]
+        self.level_faculty = [self.pair_faculty[table] for table in self.level_tables]
+
+        # Map the run's faculty and courses onto the ids of the conflict engine and course table
+        self.faculty_ids = np.full(len(self.faculty_list), FREE, dtype=np.int32)
+        for ind, faculty in enumerate(self.faculty_list):
+            self.faculty_ids[ind] = self.conflicts.faculty_ids.get(faculty, FREE)
+        self.course_ids_map = np.full(len(self.course_list), FREE, dtype=np.int32)
+        self.prepared = True
+
+    def fill_day(self, day):
+        if not self.prepared:
+            self.prepare()
+        hours, counts, first_double, busy = self.hours, self.counts, self.first_double, self.busy
+        counts[:] = 0
+        busy[:] = False
+        slots = self.grid.slots_per_day
+        day_faculty = np.full((len(self.grid.classrooms), slots), FREE, dtype=np.int64)
+        day_course = np.full_like(day_faculty, FREE)
+
+        for rooms, table, faculty in zip(self.levels, self.level_tables, self.level_faculty):
+            for slot in range(slots):
+                room_counts = counts[table]
+                doubled = first_double[table]
+                valid = ((hours[table] > 0) & (room_counts < 3)
+                         & ~((room_counts == 1) & (doubled > 0) & (doubled < day))
+                         & ~busy[faculty, slot])
+                filled = np.flatnonzero(valid.any(axis=1))
+                if not len(filled):
+                    continue
+                chosen = table[filled, valid[filled].argmax(axis=1)]
+                hours[chosen] -= 1
+                counts[chosen] += 1
+                first_double[chosen[(counts[chosen] == 2) & (first_double[chosen] == 0)]] = day
+                busy[self.pair_faculty[chosen], slot] = True
+                day_faculty[rooms[filled], slot] = self.pair_faculty[chosen]
+                day_course[rooms[filled], slot] = self.pair_course[chosen]
+
+        self.write_day(day_faculty, day_course)
+
+    def write_day(self, day_faculty, day_course):
+        """ Copies a day's choices into the slot grid, giving new faculty and courses ids in slot order."""
+        taken = day_faculty.ravel() >= 0
+        allocations = int(np.count_nonzero(taken))
+        self.hours_left -= allocations
+        if not allocations:
+            return
+        for values, ids, objects, register in (
+                (day_faculty.ravel()[taken], self.faculty_ids, self.faculty_list, self.conflicts.add_faculty),
+                (day_course.ravel()[taken], self.course_ids_map, self.course_list,
+                 lambda course: self.course_ids.setdefault(course, len(self.course_ids)))):
+            new = values[ids[values] == FREE]
+            if len(new):
+                unique, first = np.unique(new, return_index=True)
+                for ind in unique[np.argsort(first)].tolist():
+                    ids[ind] = register(objects[ind])
+
+        cells = np.frombuffer(self.grid.cells, dtype=np.int32)
+        course_cells = np.frombuffer(self.grid.course_cells, dtype=np.int32)
+        cells[taken] = self.faculty_ids[day_faculty.ravel()[taken]]
+        course_cells[taken] = self.course_ids_map[day_course.ravel()[taken]]
+
+        if self.render:
+            # Rendering reads the day's allocations from the slots
+            for classroom_id, slot in np.argwhere(day_faculty >= 0).tolist():
+                classroom = self.grid.classrooms[classroom_id]
+                self.class_slots[classroom][slot].allocate(self.faculty_list[day_faculty[classroom_id, slot]])
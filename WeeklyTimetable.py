@@ -0,0 +1,183 @@
+import numpy as np
+
+from SlotGrid import FREE
+from TimetableResult import TimetableResult
+
+
+class WeeklyTimetable:
+    """ A term timetable that repeats one solved week.
+    Only the week's grids are stored; term days are mapped onto week days when they are
+    read, so memory does not grow with the term length. It offers the reading methods of
+    TimetableResult (iteration, `day_strings`, the classroom and faculty views used by
+    `export`), while `cells`, `course_cells` and `expand()` build the full term grids.
+    A week cell may be taught in only the first weeks of the term, so that a course whose
+    hours do not divide by the number of weeks is not over-taught in the final weeks.
+    Attributes:
+        week (TimetableResult): The solved week, shaped week days x classrooms x slots.
+        weeks (int): The number of weeks in the term.
+        taught_weeks (np.ndarray): The number of weeks each week cell is taught, shaped like the
+            week's cells, or None when every class is taught every week.
+    """
+    __slots__ = ("week", "weeks", "taught_weeks", "_days")
+
+    def __init__(self, week, weeks, taught_weeks=None):
+        self.week = week
+        self.weeks = weeks
+        self.taught_weeks = None if taught_weeks is None else np.asarray(taught_weeks, dtype=np.int32)
+        self._days = None
+
+    @property
+    def week_days(self):
+        """ The number of days in a week."""
+        return self.week.days
+
+    @property
+    def days(self):
+        """ The number of days in the term, without trailing days left free by the final weeks."""
+        if self._days is None:
+            days = self.week.days * self.weeks
+            if self.taught_weeks is not None:
+                # The last taught day is the latest (week, day) of any taught week cell
+                week_days, _, _ = np.nonzero(self.week.cells != FREE)
+                if len(week_days):
+                    last_weeks = self.taught_weeks[self.week.cells != FREE] - 1
+                    days = int(np.max(last_weeks * self.week_days + week_days)) + 1
+            self._days = days
+        return self._days
+
+    @property
+    def slots_per_day(self):
+        return self.week.slots_per_day
+
+    @property
+    def free_slots(self):
+        """ The number of free slots across the term."""
+        if self.taught_weeks is None:
+            return self.week.free_slots * self.weeks
+        taught = int(np.sum(self.taught_weeks[self.week.cells != FREE]))
+        return self.days * len(self.class_names) * self.slots_per_day - taught
+
+    @property
+    def class_names(self):
+        return self.week.class_names
+
+    @property
+    def faculty_names(self):
+        return self.week.faculty_names
+
+    @property
+    def course_codes(self):
+        return self.week.course_codes
+
+    @property
+    def course_names(self):
+        return self.week.course_names
+
+    def _term(self, grid, taught_weeks):
+        # Repeats week rows (week days first) over the term, freeing cells past their taught weeks
+        shape = (self.weeks,) + (1,) * (grid.ndim - 1)
+        term = np.tile(grid, shape)
+        if taught_weeks is not None:
+            week_of = np.repeat(np.arange(self.weeks), self.week_days).reshape((-1,) + shape[1:])
+            term[week_of >= np.tile(taught_weeks, shape)] = FREE
+        return term[:self.days]
+
+    @property
+    def cells(self):
+        """ The term's faculty ids, days x classrooms x slots. This builds the full grid."""
+        return self._term(self.week.cells, self.taught_weeks)
+
+    @property
+    def course_cells(self):
+        """ The term's course ids, like `cells`. This builds the full grid."""
+        return self._term(self.week.course_cells, self.taught_weeks)
+
+    def expand(self):
+        """ Returns the whole term as a TimetableResult."""
+        return TimetableResult(self.cells, self.course_cells, self.class_names, self.faculty_names,
+                               self.course_codes, self.course_names)
+
+    def classroom_id(self, classroom):
+        return self.week.classroom_id(classroom)
+
+    def faculty_id(self, faculty):
+        return self.week.faculty_id(faculty)
+
+    def _taught(self, days, classroom_ids, slots):
+        # Whether matching arrays of term days, classroom ids and slots fall in a taught week
+        if self.taught_weeks is None:
+            return np.ones(np.shape(days), dtype=bool)
+        return days // self.week_days < self.taught_weeks[days % self.week_days, classroom_ids, slots]
+
+    def day_cells(self, day):
+        """ Returns a classrooms x slots array of one term day's faculty ids."""
+        cells = self.week.day_cells(day % self.week_days)
+        if self.taught_weeks is None:
+            return cells
+        return np.where(day // self.week_days < self.taught_weeks[day % self.week_days], cells, FREE)
+
+    def classroom_view(self, classroom):
+        """ Returns a days x slots array of a classroom's faculty ids over the term."""
+        taught_weeks = None if self.taught_weeks is None else self.taught_weeks[:, self.classroom_id(classroom), :]
+        return self._term(self.week.classroom_view(classroom), taught_weeks)
+
+    def classroom_rows(self, classroom):
+        """ Returns a classroom's faculty names per day, with 'free' for free slots."""
+        if self.taught_weeks is None:
+            return self.week.classroom_rows(classroom) * self.weeks
+        return self.week._name_table()[self.classroom_view(classroom)].tolist()
+
+    def course_view(self, classroom):
+        """ Returns a days x slots array of a classroom's course ids over the term."""
+        taught_weeks = None if self.taught_weeks is None else self.taught_weeks[:, self.classroom_id(classroom), :]
+        return self._term(self.week.course_view(classroom), taught_weeks)
+
+    def courses_at(self, days, classroom_ids, slots):
+        """ Returns the course ids at matching arrays of term days, classroom ids and slots."""
+        days = np.asarray(days)
+        courses = self.week.courses_at(days % self.week_days, classroom_ids, slots)
+        return np.where(self._taught(days, classroom_ids, slots), courses, FREE)
+
+    def faculty_view(self, faculty):
+        """
+        Returns where a faculty member teaches over the term.
+
+        Returns:
+            np.ndarray: Rows of (day, classroom id, slot), in day order.
+        """
+        rows = self.week.faculty_view(faculty)
+        offsets = np.zeros((self.weeks, 1, 3), dtype=rows.dtype)
+        offsets[:, 0, 0] = np.arange(self.weeks) * self.week_days
+        rows = (rows[None, :, :] + offsets).reshape(-1, 3)
+        return rows[self._taught(rows[:, 0], rows[:, 1], rows[:, 2])]
+
+    def course_of(self, day, classroom, slot):
+        """ Returns the code of the course taught in a slot, or None if it is free or unknown."""
+        if not self._taught(day, self.classroom_id(classroom), slot):
+            return None
+        return self.week.course_of(day % self.week_days, classroom, slot)
+
+    def day_strings(self, day, names=None):
+        """ Returns one term day in the "Day N" / "CLASS: name, free, ..." string format."""
+        names = self.week._name_table() if names is None else names
+        day_schedule = [f"Day {day + 1}"]
+        for class_name, row in zip(self.class_names, names[self.day_cells(day)].tolist()):
+            day_schedule.append(f"{class_name}: {', '.join(row)}")
+        return day_schedule
+
+    def to_strings(self):
+        """ Returns the whole term in the string format of older versions."""
+        return list(self)
+
+    def __len__(self):
+        return self.days
+
+    def __getitem__(self, day):
+        if isinstance(day, slice):
+            return [self.day_strings(ind) for ind in range(self.days)[day]]
+        return self.day_strings(range(self.days)[day])
+
+    def __iter__(self):
+        names = self.week._name_table()
+        for day in range(self.days):
+            yield self.day_strings(day, names)
@@ -1,17 +1,23 @@
+import queue
 import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3
-import networkx as nx
-from reportlab.lib.pagesizes import A3, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
-from ClassSlots import ClassSlots
+from tkinter import ttk, messagebox, filedialog
 from Faculty import Faculty
 from Classroom import Classroom
 from Course import Course
-from simple_scheduler import generate_timetable
+from FacultySchedule import FacultySchedule
+from SchedulerDB import SchedulerDB
+from TimetableCache import TimetableCache
+from TimetableWorker import TimetableWorker
+from engines import available_engines, DEFAULT_ENGINE
+from repair import repair_timetable
+from export import write_pdf, export_timetable
+from importer import import_files
 
 # GUI Application
+PROFILE_FILE = "scheduler_profile.prof"
+POLL_INTERVAL = 50  # Milliseconds between checks for generation progress
+
+
 class SchedulerApp:
     def __init__(self, root):
         self.root = root
@@ -98,11 +104,27 @@ class SchedulerApp:
         self.assign_course_combo.grid(row=3, column=5, sticky="ew", padx=5, pady=5)
         ttk.Button(self.input_subframe, text="Assign", command=self.assign_faculty).grid(row=3, column=6, padx=5, pady=5)
 
+        ttk.Label(self.input_subframe, text="Engine:").grid(row=4, column=0, sticky="w", padx=5, pady=5)
+        self.engine_combo = ttk.Combobox(self.input_subframe, state="readonly", width=27, values=available_engines())
+        self.engine_combo.set(DEFAULT_ENGINE)
+        self.engine_combo.grid(row=4, column=1, sticky="ew", padx=5, pady=5)
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.input_subframe, text="Profile run", variable=self.profile_var).grid(row=4, column=2, sticky="w", padx=5, pady=5)
+
         # Buttons
         self.button_frame.grid_columnconfigure(0, weight=1)
-        ttk.Button(self.button_frame, text="Generate Timetable", command=self.generate_timetable).grid(row=0, column=0, padx=5, pady=5)
+        self.generate_button = ttk.Button(self.button_frame, text="Generate Timetable", command=self.generate_timetable)
+        self.generate_button.grid(row=0, column=0, padx=5, pady=5)
+        self.cancel_button = ttk.Button(self.button_frame, text="Cancel", command=self.cancel_generation, state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=5, pady=5)
         ttk.Button(self.button_frame, text="Save as PDF", command=self.save_pdf).grid(row=2, column=0, padx=5, pady=5)
         ttk.Button(self.button_frame, text="Clear Database", command=self.clear_database).grid(row=1, column=0, padx=5, pady=5)
+        ttk.Button(self.button_frame, text="Export...", command=self.export_timetable).grid(row=3, column=0, padx=5, pady=5)
+        ttk.Button(self.button_frame, text="Import...", command=self.import_data).grid(row=4, column=0, padx=5, pady=5)
+        self.progress = ttk.Progressbar(self.button_frame, length=300, mode="determinate", maximum=100)
+        self.progress.grid(row=5, column=0, padx=5, pady=5)
+        self.progress_label = ttk.Label(self.button_frame, text="")
+        self.progress_label.grid(row=6, column=0, padx=5, pady=5)
 
         # Output Text
         self.output_text = tk.Text(self.output_frame, height=20, width=90, font=("Candara", 14), bg="#0000aa", fg="#ffffff")
@@ -111,60 +133,30 @@ class SchedulerApp:
         self.output_frame.grid_columnconfigure(0, weight=1)
 
         # Load initial data from database
+        self.db = SchedulerDB("scheduler.db")
+        self.cache = TimetableCache(self.db.conn)
+        self.timetable_data = None
+        self.worker = None
         self.load_data()
 
-    def init_db(self):
-        conn = sqlite3.connect('scheduler.db')
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS classrooms (class_name TEXT PRIMARY KEY)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS courses (code TEXT PRIMARY KEY, name TEXT, hours INTEGER)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS faculty (name TEXT PRIMARY KEY)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS assignments (faculty_name TEXT, class_name TEXT, course_code TEXT, 
-                    FOREIGN KEY(faculty_name) REFERENCES faculty(name), 
-                    FOREIGN KEY(class_name) REFERENCES classrooms(class_name), 
-                    FOREIGN KEY(course_code) REFERENCES courses(code))''')
-        conn.commit()
-        conn.close()
-
     def load_data(self):
-        conn = sqlite3.connect('scheduler.db')
-        c = conn.cursor()
-        
-        # Fetch and debug classrooms
-        c.execute("SELECT class_name FROM classrooms")
-        self.classrooms = [Classroom(row[0]) for row in c.fetchall()]
-        
-        # Fetch and debug courses
-        c.execute("SELECT code, name, hours FROM courses")
-        self.courses = [Course(row[1], row[0], row[2]) for row in c.fetchall()]
-        
-        # Fetch and debug faculty
-        c.execute("SELECT name FROM faculty")
-        self.faculties = [Faculty(row[0]) for row in c.fetchall()]
-        
-        # Fetch and debug assignments
-        c.execute("SELECT faculty_name, class_name, course_code FROM assignments")
-        assignments = c.fetchall()
-        for row in assignments:
-            faculty = next(f for f in self.faculties if f.name == row[0])
-            classroom = next(c for c in self.classrooms if c.class_name == row[1])
-            course = next(c for c in self.courses if c.code == row[2])
-            faculty.add_classes(classrooms={classroom: course})
-        
+        self.classroom_map, self.course_map, self.faculty_map = self.db.load()
+        self.classrooms = list(self.classroom_map.values())
+        self.courses = list(self.course_map.values())
+        self.faculties = list(self.faculty_map.values())
         self.update_combos()
-        conn.close()
 
     def add_classroom(self):
         class_name = self.classroom_entry.get().strip()
-        if class_name and class_name not in [c.class_name for c in self.classrooms]:
-            conn = sqlite3.connect('scheduler.db')
-            c = conn.cursor()
-            c.execute("INSERT OR IGNORE INTO classrooms (class_name) VALUES (?)", (class_name,))
-            conn.commit()
-            conn.close()
-            self.load_data()
+        if class_name and class_name not in self.classroom_map:
+            self.db.add_classroom(class_name)
+            classroom = Classroom(class_name)
+            self.classroom_map[class_name] = classroom
+            self.classrooms.append(classroom)
+            self.update_combos()
             self.classroom_entry.delete(0, tk.END)
             self.output_text.insert(tk.END, f"Added classroom: {class_name}\n")
+            self.update_timetable([class_name])
         else:
             messagebox.showwarning("Input Error", "Please enter a unique classroom name.")
 
@@ -172,13 +164,12 @@ class SchedulerApp:
         name = self.course_name_entry.get().strip()
         code = self.course_code_entry.get().strip()
         hours = self.course_hours_entry.get().strip()
-        if name and code and hours.isdigit() and code not in [c.code for c in self.courses]:
-            conn = sqlite3.connect('scheduler.db')
-            c = conn.cursor()
-            c.execute("INSERT OR IGNORE INTO courses (code, name, hours) VALUES (?, ?, ?)", (code, name, int(hours)))
-            conn.commit()
-            conn.close()
-            self.load_data()
+        if name and code and hours.isdigit() and code not in self.course_map:
+            self.db.add_course(code, name, int(hours))
+            course = Course(name, code, int(hours))
+            self.course_map[code] = course
+            self.courses.append(course)
+            self.update_combos()
             self.course_name_entry.delete(0, tk.END)
             self.course_code_entry.delete(0, tk.END)
             self.course_hours_entry.delete(0, tk.END)
@@ -188,18 +179,30 @@ class SchedulerApp:
 
     def add_faculty(self):
         name = self.faculty_entry.get().strip()
-        if name and name not in [f.name for f in self.faculties]:
-            conn = sqlite3.connect('scheduler.db')
-            c = conn.cursor()
-            c.execute("INSERT OR IGNORE INTO faculty (name) VALUES (?)", (name,))
-            conn.commit()
-            conn.close()
-            self.load_data()
+        if name and name not in self.faculty_map:
+            self.db.add_faculty(name)
+            faculty = Faculty(name)
+            self.faculty_map[name] = faculty
+            self.faculties.append(faculty)
+            self.update_combos()
             self.faculty_entry.delete(0, tk.END)
             self.output_text.insert(tk.END, f"Added faculty: {name}\n")
         else:
             messagebox.showwarning("Input Error", "Please enter a unique faculty name.")
 
+    def import_data(self):
+        paths = filedialog.askopenfilenames(filetypes=[("CSV or JSON", "*.csv *.json"), ("CSV", "*.csv"), ("JSON", "*.json")])
+        if not paths:
+            return
+        try:
+            report = import_files(self.db, paths)
+        except (ValueError, OSError) as error:
+            messagebox.showerror("Import Error", str(error))
+            return
+        self.load_data()
+        self.output_text.insert(tk.END, f"{report}\n")
+        self.update_timetable(None)
+
     def update_combos(self):
         self.assign_faculty_combo['values'] = [f.name for f in self.faculties]
         self.assign_classroom_combo['values'] = [c.class_name for c in self.classrooms]
@@ -210,52 +213,118 @@ class SchedulerApp:
         class_name = self.assign_classroom_combo.get()
         course_code = self.assign_course_combo.get()
         if faculty_name and class_name and course_code:
-            conn = sqlite3.connect('scheduler.db')
-            c = conn.cursor()
-            c.execute("SELECT name FROM faculty WHERE name=?", (faculty_name,))
-            if not c.fetchone():
+            if faculty_name not in self.faculty_map:
                 messagebox.showwarning("Input Error", "Faculty not found.")
-                conn.close()
                 return
-            c.execute("SELECT class_name FROM classrooms WHERE class_name=?", (class_name,))
-            if not c.fetchone():
+            if class_name not in self.classroom_map:
                 messagebox.showwarning("Input Error", "Classroom not found.")
-                conn.close()
                 return
-            c.execute("SELECT code FROM courses WHERE code=?", (course_code,))
-            if not c.fetchone():
+            if course_code not in self.course_map:
                 messagebox.showwarning("Input Error", "Course not found.")
-                conn.close()
                 return
-            c.execute("INSERT INTO assignments (faculty_name, class_name, course_code) VALUES (?, ?, ?)", 
-                      (faculty_name, class_name, course_code))
-            conn.commit()
-            conn.close()
-            self.load_data()
+            self.db.assign(faculty_name, class_name, course_code)
+            self.faculty_map[faculty_name].add_classes(classrooms={self.classroom_map[class_name]: self.course_map[course_code]})
             self.output_text.insert(tk.END, f"Assigned {faculty_name} to {class_name} for {course_code}\n")
+            self.update_timetable([faculty_name, class_name])
         else:
             messagebox.showwarning("Input Error", "Please select all assignment details.")
 
+    def update_timetable(self, affected):
+        # Repair the existing timetable for the changed rows instead of regenerating it
+        if not self.timetable_data:
+            return
+        self.timetable_data = repair_timetable(self.timetable_data, self.classrooms, self.faculties, affected)
+        self.output_text.insert(tk.END, "Timetable updated for the change. Press Generate Timetable to rebuild it from scratch.\n")
+
     def generate_timetable(self):
+        if self.worker is not None:
+            return
         if not self.classrooms or not self.faculties:
             messagebox.showwarning("Data Error", "Add classrooms and faculty first!")
             return
-        
-        self.G = nx.Graph()
-        self.class_slots = {room: [ClassSlots(room, ind) for ind in range(1, 8)] for room in self.classrooms}
-        for classroom in self.class_slots.keys():
-            self.G.add_nodes_from(self.class_slots[classroom])
-        
-        self.faculty_schedule = {faculty: {classroom: [] for classroom in faculty.assigned_classes.keys()} for faculty in self.faculties}
-        
-        self.timetable_data = generate_timetable(self.G, self.class_slots, self.faculties, self.faculty_schedule)
-        
+
+        engine_name = self.engine_combo.get()
+        key = TimetableCache.key(self.classrooms, self.faculties, engine=engine_name)
         self.output_text.delete(1.0, tk.END)
         self.output_text.insert(tk.END, "=== Timetable ===\n")
-        for day_data in self.timetable_data:
-            for line in day_data:
-                self.output_text.insert(tk.END, f"{line}\n")
-            self.output_text.insert(tk.END, "\n")
+        # A profiled run always schedules, so the cache is bypassed
+        cached = None if self.profile_var.get() else self.cache.get(key)
+        if cached:
+            self.timetable_data, report = cached
+            for day_data in self.timetable_data:
+                for line in day_data:
+                    self.output_text.insert(tk.END, f"{line}\n")
+                self.output_text.insert(tk.END, "\n")
+            self.output_text.insert(tk.END, f"{report} (cached)\n")
+            self.progress["value"] = 100
+            self.progress_label["text"] = "Loaded from cache"
+            self.show_cache_stats()
+            return
+
+        # Schedule on a background thread; poll_worker shows each day as it finishes
+        for faculty in self.faculties:
+            faculty.reset_hours()
+        self.worker = TimetableWorker(self.classrooms, self.faculties, engine_name,
+                                      PROFILE_FILE if self.profile_var.get() else None)
+        self.worker_key = key
+        self.progress["value"] = 0
+        self.progress_label["text"] = "Generating..."
+        self.generate_button.state(["disabled"])
+        self.cancel_button.state(["!disabled"])
+        self.worker.start()
+        self.root.after(POLL_INTERVAL, self.poll_worker)
+
+    def poll_worker(self):
+        while True:
+            try:
+                event = self.worker.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "day":
+                _, day, lines, placed, total = event
+                for line in lines:
+                    self.output_text.insert(tk.END, f"{line}\n")
+                self.output_text.insert(tk.END, "\n")
+                self.output_text.see(tk.END)
+                self.progress["value"] = 100 * placed / total if total else 100
+                self.progress_label["text"] = f"Day {day}: {placed} of {total} hours placed"
+            elif event[0] == "done":
+                _, timetable, report, profile_text = event
+                self.finish_generation(f"Done: {report}")
+                self.timetable_data = timetable
+                self.cache.put(self.worker_key, timetable, report, settings=report.engine)
+                self.output_text.insert(tk.END, f"{report}\n")
+                self.show_cache_stats()
+                if profile_text:
+                    self.output_text.insert(tk.END, f"\n=== Profile ===\n{profile_text}")
+                    self.output_text.insert(tk.END, f"Profile written to {PROFILE_FILE}\n")
+                if TimetableCache.key(self.classrooms, self.faculties, engine=report.engine) != self.worker_key:
+                    self.update_timetable(None)  # The data changed while generating
+                return
+            elif event[0] == "cancelled":
+                self.finish_generation("Cancelled")
+                self.output_text.insert(tk.END, "Generation cancelled.\n")
+                return
+            else:
+                self.finish_generation("Failed")
+                messagebox.showerror("Generation Error", event[1])
+                return
+        self.root.after(POLL_INTERVAL, self.poll_worker)
+
+    def finish_generation(self, status):
+        self.worker = None
+        self.progress_label["text"] = status
+        self.generate_button.state(["!disabled"])
+        self.cancel_button.state(["disabled"])
+
+    def cancel_generation(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.progress_label["text"] = "Cancelling after the current day..."
+
+    def show_cache_stats(self):
+        stats = self.cache.stats()
+        self.output_text.insert(tk.END, f"Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries\n")
 
     def save_pdf(self):
         if not self.timetable_data:
@@ -263,92 +332,37 @@ class SchedulerApp:
             return
 
         pdf_file = "timetable.pdf"
-        doc = SimpleDocTemplate(pdf_file, pagesize=landscape(A3))  # Bigger Page Size
-        elements = []
-        
-        slot_headers = ["Day", "1", "2", "Break", "3", "4", "Break", "5", "6", "7"]
-        
-        col_widths = [50, 135, 135, 50, 135, 135, 50, 135, 135, 135]  # Narrower Break Columns
-
-        classroom_names = [classroom.class_name for classroom in self.classrooms]
-
-        for class_index, class_name in enumerate(classroom_names):
-            # Add class title
-            elements.append(Table([[class_name]], colWidths=[sum(col_widths)], style=[
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 16),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ]))
-
-            table_data = [slot_headers]
-            merge_styles = []  # Store merging information
-
-            for row_idx, day_entry in enumerate(self.timetable_data):
-                day = day_entry[0]
-                schedule = day_entry[class_index + 1].split(": ")[1].split(", ")
-
-                # Insert "Break" slots
-                formatted_schedule = schedule[:2] + ["Break"] + schedule[2:4] + ["Break"] + schedule[4:]
-
-                while len(formatted_schedule) < 9:
-                    formatted_schedule.append("")
-
-                row = [day] + formatted_schedule
-                table_data.append(row)
-
-                # Handle merging
-                col_start = 1  # Skip "Day" column
-                while col_start < len(row):
-                    col_end = col_start
-                    while col_end + 1 < len(row) and row[col_end] == row[col_end + 1] and "Break" not in row[col_start]:  
-                        col_end += 1  # Extend merge range
-
-                    if col_end > col_start:  # If merge needed
-                        merge_styles.append(('SPAN', (col_start, row_idx + 1), (col_end, row_idx + 1)))
-                        merge_styles.append(('ALIGN', (col_start, row_idx + 1), (col_end, row_idx + 1), 'CENTER'))
-                        merge_styles.append(('VALIGN', (col_start, row_idx + 1), (col_end, row_idx + 1), 'MIDDLE'))
-                        for i in range(col_start + 1, col_end + 1):
-                            row[i] = ""  # Remove redundant text in merged cells
-                    
-                    col_start = col_end + 1  # Move to next unmerged cell
-
-            # Create Table
-            t = Table(table_data, colWidths=col_widths)  
-            t.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),  # Bigger Font
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 14),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),  # Default grid
-            ] + merge_styles + [
-                ('BOX', (0, 0), (-1, -1), 1, colors.black),  # Ensure outer border
-            ]))  
-
-            elements.append(t)
-            elements.append(Table([[""]], colWidths=[sum(col_widths)]))  # Spacer
-
-        doc.build(elements)
+        write_pdf(self.timetable_data, pdf_file)
         self.output_text.insert(tk.END, f"Timetable saved as {pdf_file}\n")
 
+    def export_timetable(self):
+        if not self.timetable_data:
+            messagebox.showwarning("No Data", "Please generate the timetable first!")
+            return
+
+        path = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            initialfile="timetable.pdf",
+            filetypes=[("PDF", "*.pdf"), ("CSV", "*.csv"), ("iCalendar", "*.ics")],
+        )
+        if not path:
+            return
+        for written in export_timetable(self.timetable_data, path):
+            self.output_text.insert(tk.END, f"Timetable exported to {written}\n")
+
     def clear_database(self):
-        conn = sqlite3.connect('scheduler.db')
-        c = conn.cursor()
-        c.execute("DELETE FROM assignments")
-        c.execute("DELETE FROM faculty")
-        c.execute("DELETE FROM courses")
-        c.execute("DELETE FROM classrooms")
-        conn.commit()
-        conn.close()
+        self.cancel_generation()
+        self.db.clear()
+        self.cache.clear()
+        self.classroom_map = {}
+        self.course_map = {}
+        self.faculty_map = {}
         self.classrooms = []
         self.courses = []
         self.faculties = []
         self.class_slots = {}
-        self.faculty_schedule = {}
-        self.timetable_data = []
+        self.faculty_schedule = FacultySchedule()
+        self.timetable_data = None
         self.update_combos()
         self.output_text.delete(1.0, tk.END)
         self.output_text.insert(tk.END, "Database cleared successfully.\n")
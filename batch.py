@@ -0,0 +1,261 @@
+import argparse
+import contextlib
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from SchedulerDB import SchedulerDB
+from SchedulerMetrics import SchedulerMetrics
+from TimetableCache import TimetableCache
+from engines import available_engines, DEFAULT_ENGINE
+from export import FORMATS, export_timetable
+from importer import import_files
+from multistart import multistart, run_seed
+from optimize import improve_timetable
+from profiling import profiled
+from weekly import DEFAULT_IMPROVE, weekly_timetable
+
+IMPORT_EXTENSIONS = (".csv", ".json")
+TIMEOUT_GRACE = 0.5  # Seconds past a department's time limit before it is stopped
+
+
+def find_departments(paths):
+    """
+    Turns command-line paths into departments.
+    A .db file is one department, as is a single .csv or .json import file or a
+    directory of them. The department is named after the file or directory.
+
+    Args:
+        paths (list): Database files, import files or directories of import files.
+
+    Returns:
+        list: (name, sources) pairs, where sources is the database or the import files.
+    """
+    departments = []
+    names = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+        if os.path.isdir(path):
+            sources = sorted(os.path.join(path, entry) for entry in os.listdir(path)
+                             if os.path.splitext(entry)[1].lower() in IMPORT_EXTENSIONS)
+            if not sources:
+                raise ValueError(f"No .csv or .json files in '{path}'.")
+        elif path.lower().endswith(".db") or os.path.splitext(path)[1].lower() in IMPORT_EXTENSIONS:
+            if not os.path.isfile(path):
+                raise ValueError(f"'{path}' does not exist.")
+            sources = [path]
+        else:
+            raise ValueError(f"Cannot schedule '{path}'. Use .db files, .csv/.json files or directories of them.")
+        if stem in names:
+            raise ValueError(f"Two departments are named '{stem}'. Rename one of them.")
+        names.add(stem)
+        departments.append((stem, sources))
+    return departments
+
+
+@contextlib.contextmanager
+def time_limited(seconds):
+    """
+    Raises TimeoutError in the enclosed code once `seconds` have passed, so even a single
+    engine run can be stopped. This needs SIGALRM and the main thread (as in batch workers);
+    elsewhere the code runs without the hard limit.
+
+    Args:
+        seconds (float): The limit, or None for no limit.
+    """
+    if seconds is None or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise TimeoutError(f"Stopped after {seconds:g}s.")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 1e-3))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def open_department(sources):
+    """ Opens a department's database, importing import files into a temporary in-memory one."""
+    if len(sources) == 1 and sources[0].lower().endswith(".db"):
+        return SchedulerDB(sources[0])
+    db = SchedulerDB(":memory:")
+    import_files(db, sources)
+    return db
+
+
+def run_department(name, sources, out_dir, engine=DEFAULT_ENGINE, seed=None, starts=1, time_limit=None,
+                   formats=("pdf",), by="classroom", cache=False, workers=1, metrics=False, profile=False, improve=None,
+                   weeks=None, week_days=5):
+    """
+    Schedules one department and writes its exports to `out_dir/name/`.
+    Errors are caught and reported so that one bad department does not stop the batch.
+
+    Args:
+        name (str): The department name.
+        sources (list): The department's database or import files.
+        out_dir (str): The directory for the exports.
+        engine (str): The engine name.
+        seed (int): Optional engine seed, or the base seed with `starts`.
+        starts (int): Randomised starts to run; the best timetable is kept.
+        time_limit (float): Optional budget in seconds for scheduling the department, from loading it to
+            the end of compaction. The starts, weekly fitting and compaction share what is left of it,
+            and a department still scheduling `TIMEOUT_GRACE` seconds after it is stopped with status "timeout".
+            Exports are not limited.
+        formats (list): Export formats from `export.FORMATS`.
+        by (str): Export one table per "classroom" or per "faculty".
+        cache (bool): Reuse and store timetables in the department's database (single starts only).
+        workers (int): Worker processes for the starts.
+        metrics (bool): Add the run's SchedulerMetrics summary (single starts only).
+        profile (bool): Run under cProfile and write `profile.prof` next to the exports.
+        improve (float): Seconds of local search to compact the timetable with (see `optimize`). With
+            `weeks`, the time to fit the week; None uses the `weekly` default.
+        weeks (int): Solve one week and repeat it for this many weeks (see `weekly`); not cached.
+        week_days (int): Teaching days per week with `weeks`.
+
+    Returns:
+        dict: The department's summary, with "status" "ok", "timeout" or "error".
+    """
+    start = time.perf_counter()
+
+    def remaining(seconds=None):
+        # The time left of the department's budget, capped at `seconds`
+        if time_limit is None:
+            return seconds
+        left = max(0.0, time_limit - (time.perf_counter() - start))
+        return left if seconds is None else min(seconds, left)
+
+    summary = {"department": name, "sources": list(sources)}
+    db = None
+    department_dir = os.path.join(out_dir, name)
+    try:
+        os.makedirs(department_dir, exist_ok=True)
+        with time_limited(None if time_limit is None else time_limit + TIMEOUT_GRACE):
+            db = open_department(sources)
+            classroom_map, _, faculty_map = db.load()
+            classrooms, faculties = list(classroom_map.values()), list(faculty_map.values())
+
+            timetable_cache = key = cached = None
+            if cache and starts <= 1 and not weeks and db.path != ":memory:":
+                timetable_cache = TimetableCache(db.conn)
+                key = TimetableCache.key(classrooms, faculties, engine=engine, seed=seed)
+                cached = timetable_cache.get(key)
+            run_metrics = SchedulerMetrics() if metrics and starts <= 1 else None
+            with profiled(os.path.join(department_dir, "profile.prof"), enabled=profile):
+                if cached:
+                    timetable, report = cached
+                elif weeks:
+                    week_improve = remaining(DEFAULT_IMPROVE if improve is None else improve)
+                    timetable, report = weekly_timetable(classrooms, faculties, weeks, week_days=week_days, engine=engine,
+                                                         seed=seed, improve=week_improve)
+                elif starts > 1:
+                    result = multistart(classrooms, faculties, engine=engine, iterations=starts, time_limit=remaining(),
+                                        workers=workers, base_seed=seed or 0)
+                    timetable, report = result.timetable, result.report
+                    summary["runs"], summary["seed"] = result.runs, result.seed
+                else:
+                    timetable, report = run_seed(classrooms, faculties, engine, seed, metrics=run_metrics)
+                    if timetable_cache:
+                        timetable_cache.put(key, timetable, report, settings=engine)
+            if run_metrics is not None and not cached:
+                summary["metrics"] = run_metrics.summary()
+            if improve and not weeks:
+                improve_start = time.perf_counter()
+                timetable = improve_timetable(timetable, time_limit=remaining(improve), seed=seed)
+                summary["improve"] = {"days_before": report.days, "free_slots_before": report.free_slots,
+                                      "seconds": time.perf_counter() - improve_start}
+
+        files = []
+        for fmt in formats:
+            files.extend(export_timetable(timetable, os.path.join(department_dir, f"timetable.{fmt}"), fmt=fmt, by=by))
+        summary.update(status="ok", engine=report.engine, days=timetable.days, free_slots=timetable.free_slots,
+                       solve_time=report.runtime, cached=bool(cached), files=files)
+    except TimeoutError:
+        summary.update(status="timeout", error=f"Stopped at the {time_limit:g}s time limit.")
+    except Exception as error:
+        summary.update(status="error", error=f"{type(error).__name__}: {error}")
+    finally:
+        if db is not None:
+            db.close()
+    summary["runtime"] = time.perf_counter() - start
+    return summary
+
+
+def run_batch(departments, out_dir, workers=None, **options):
+    """
+    Schedules many departments, in parallel worker processes when there is more than one.
+    A single department gets the workers for its own randomised starts instead.
+
+    Args:
+        departments (list): (name, sources) pairs from `find_departments`.
+        out_dir (str): The output directory; each department writes to a subdirectory.
+        workers (int): The number of worker processes (defaults to the CPU count).
+        options: Settings passed to `run_department`.
+
+    Returns:
+        list: The department summaries, in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(departments) == 1 or workers <= 1:
+        department_workers = workers if len(departments) == 1 else 1
+        return [run_department(name, sources, out_dir, workers=department_workers, **options)
+                for name, sources in departments]
+    with ProcessPoolExecutor(max_workers=min(workers, len(departments))) as pool:
+        futures = [pool.submit(run_department, name, sources, out_dir, **options) for name, sources in departments]
+        return [future.result() for future in futures]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and export timetables for many departments without the GUI.")
+    parser.add_argument("paths", nargs="+", help="scheduler .db files, .csv/.json import files, or directories of import files")
+    parser.add_argument("--out", default="timetables", help="output directory (one subdirectory per department)")
+    parser.add_argument("--format", dest="formats", action="append", choices=FORMATS,
+                        help="export format; repeat for several (default: pdf)")
+    parser.add_argument("--by", choices=("classroom", "faculty"), default="classroom", help="one table per classroom or per faculty member")
+    parser.add_argument("--engine", choices=available_engines(), default=DEFAULT_ENGINE, help="scheduling engine to use")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a randomised run, or the base seed for --starts")
+    parser.add_argument("--starts", type=int, default=1, help="randomised starts per department; the best timetable is kept")
+    parser.add_argument("--time-limit", type=float, default=None, metavar="SECONDS",
+                        help="stop scheduling a department after this many seconds; the starts, weekly fitting "
+                             "and --improve share the budget")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", action="store_true", help="reuse timetables cached in each .db file")
+    parser.add_argument("--metrics", action="store_true", help="record validity-check counts and per-day timings in summary.json")
+    parser.add_argument("--profile", action="store_true", help="write a cProfile profile.prof for each department")
+    parser.add_argument("--improve", type=float, default=None, metavar="SECONDS",
+                        help="compact each timetable with this many seconds of local search "
+                             "(with --weeks: to fit the week, default 1, 0 turns it off)")
+    parser.add_argument("--weeks", type=int, default=None, help="solve one week and repeat it over a term of this many weeks")
+    parser.add_argument("--week-days", type=int, default=5, help="teaching days per week with --weeks")
+    args = parser.parse_args()
+
+    try:
+        departments = find_departments(args.paths)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    summaries = run_batch(departments, args.out, workers=args.workers, engine=args.engine, seed=args.seed,
+                          starts=args.starts, time_limit=args.time_limit, formats=args.formats or ["pdf"],
+                          by=args.by, cache=args.cache, metrics=args.metrics, profile=args.profile,
+                          improve=args.improve, weeks=args.weeks, week_days=args.week_days)
+    for summary in summaries:
+        if summary["status"] == "ok":
+            print(f"{summary['department']}: {summary['days']} days, {summary['free_slots']} free slots, "
+                  f"{summary['runtime']:.3f}s{' (cached)' if summary['cached'] else ''}")
+        else:
+            print(f"{summary['department']}: {'timed out' if summary['status'] == 'timeout' else 'failed'} - {summary['error']}")
+    with open(os.path.join(args.out, "summary.json"), "w", encoding="utf-8") as file:
+        json.dump(summaries, file, indent=2)
+    failed = sum(summary["status"] != "ok" for summary in summaries)
+    print(f"{len(summaries) - failed}/{len(summaries)} departments scheduled in {time.perf_counter() - start:.3f}s")
+    if failed:
+        raise SystemExit(1)
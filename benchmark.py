@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from FacultySchedule import FacultySchedule
+from SchedulerDB import SchedulerDB
+from engines import available_engines, DEFAULT_ENGINE, get_engine
+from simple_scheduler import create_slots, generate_timetable
+from synthetic import generate_instance, to_records
+
+DEFAULT_SIZES = (10, 50, 100, 500, 1000, 5000)
+TIMINGS = ("db_write", "db_load", "schedule", "export_pdf")
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_size(classrooms, engine=DEFAULT_ENGINE, repeat=3, pdf=True, seed=0, **instance):
+    """
+    Benchmarks one instance size: writing and loading the database, scheduling and PDF export.
+    Each step runs `repeat` times on a fresh copy of the data and the best time is kept,
+    which is the least noisy statistic for comparing versions.
+
+    Args:
+        classrooms (int): The number of classrooms in the synthetic instance.
+        engine (str): The engine name.
+        repeat (int): Runs per step.
+        pdf (bool): Include PDF export (needs reportlab).
+        seed (int): The instance seed.
+        instance: Extra `synthetic.generate_instance` arguments.
+
+    Returns:
+        dict: The instance size, the timetable quality (days and free slots) and the best
+            and median seconds of every step.
+    """
+    rooms, faculties = generate_instance(classrooms, seed=seed, **instance)
+    records = to_records(rooms, faculties)
+    times = {step: [] for step in TIMINGS}
+    result = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(repeat):
+            db = SchedulerDB(os.path.join(tmp, f"bench_{run}.db"))
+            _, elapsed = _timed(db.bulk_insert, records["classrooms"], records["courses"],
+                                records["faculty"], records["assignments"])
+            times["db_write"].append(elapsed)
+            (classroom_map, _, faculty_map), elapsed = _timed(db.load)
+            times["db_load"].append(elapsed)
+            db.close()
+
+            # Schedule the loaded copy so every run starts from full hours
+            G, class_slots = create_slots(list(classroom_map.values()))
+            timetable, elapsed = _timed(generate_timetable, G, class_slots, list(faculty_map.values()),
+                                        FacultySchedule(), engine=get_engine(engine))
+            times["schedule"].append(elapsed)
+            if result is not None and (timetable.days, timetable.free_slots) != result:
+                raise RuntimeError(f"The {engine} engine gave different timetables for the same data.")
+            result = (timetable.days, timetable.free_slots)
+
+            if pdf:
+                from export import write_pdf
+
+                _, elapsed = _timed(write_pdf, timetable, os.path.join(tmp, "bench.pdf"))
+                times["export_pdf"].append(elapsed)
+    return {
+        "classrooms": classrooms,
+        "faculty": len(faculties),
+        "assignments": len(records["assignments"]),
+        "engine": engine,
+        "days": result[0],
+        "free_slots": result[1],
+        "seconds": {step: min(values) for step, values in times.items() if values},
+        "median_seconds": {step: statistics.median(values) for step, values in times.items() if values},
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, engines=(DEFAULT_ENGINE,), repeat=3, pdf=True, seed=0, **instance):
+    """ Runs `bench_size` for every size and engine and returns the results with machine details."""
+    results = []
+    for classrooms in sizes:
+        for engine in engines:
+            results.append(bench_size(classrooms, engine, repeat, pdf, seed, **instance))
+            print(format_result(results[-1]), file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def format_result(result):
+    steps = ", ".join(f"{step} {seconds:.3f}s" for step, seconds in result["seconds"].items())
+    return (f"{result['classrooms']} classrooms ({result['engine']}): {result['days']} days, "
+            f"{result['free_slots']} free slots; {steps}")
+
+
+def compare(baseline, current, tolerance=1.2, min_seconds=0.01):
+    """
+    Compares two `run_benchmarks` outputs.
+    A regression is a step slower than `tolerance` times the baseline, or a timetable
+    with more days or free slots for the same instance. Steps faster than `min_seconds`
+    in both runs are too noisy to compare and are skipped.
+
+    Returns:
+        list: Descriptions of the regressions found.
+    """
+    old = {(result["classrooms"], result["engine"]): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = old.get((result["classrooms"], result["engine"]))
+        if before is None:
+            continue
+        name = f"{result['classrooms']} classrooms ({result['engine']})"
+        for metric in ("days", "free_slots"):
+            if result[metric] > before[metric]:
+                regressions.append(f"{name}: {metric} {before[metric]} -> {result[metric]}")
+        for step, seconds in result["seconds"].items():
+            if step not in before["seconds"] or max(seconds, before["seconds"][step]) < min_seconds:
+                continue
+            if seconds > before["seconds"][step] * tolerance:
+                regressions.append(f"{name}: {step} {before['seconds'][step]:.3f}s -> {seconds:.3f}s "
+                                   f"({seconds / before['seconds'][step]:.2f}x)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scheduling, PDF export and database load on synthetic institutions.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="classroom counts to benchmark")
+    parser.add_argument("--engine", dest="engines", action="append", choices=available_engines(),
+                        help=f"engine to benchmark; repeat for several (default: {DEFAULT_ENGINE})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per step; the best time is reported")
+    parser.add_argument("--no-pdf", action="store_true", help="skip PDF export")
+    parser.add_argument("--shared", type=float, default=0.3, help="share of faculty teaching in several classrooms")
+    parser.add_argument("--seed", type=int, default=0, help="instance seed")
+    parser.add_argument("--out", default=None, help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier version to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.engines or [DEFAULT_ENGINE], args.repeat, not args.no_pdf,
+                             args.seed, shared=args.shared)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(json.load(file), results, args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
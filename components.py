@@ -0,0 +1,149 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+import numpy as np
+
+from SchedulerEngine import EngineReport
+from SlotGrid import FREE
+from TimetableResult import TimetableResult
+from multistart import run_seed
+from serialize import dump_models, load_models
+
+
+def find_components(classrooms, faculties):
+    """
+    Splits the faculty-classroom assignments into independent clusters.
+    Two classrooms are in the same cluster when a chain of shared faculty links them,
+    so clusters never compete for the same faculty member and can be scheduled apart.
+
+    Args:
+        classrooms (list): The Classroom objects to schedule.
+        faculties (list): The Faculty objects with their assigned classes.
+
+    Returns:
+        list: (classrooms, faculties) pairs, each keeping the order of the inputs.
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(classrooms)
+    for faculty in faculties:
+        graph.add_node(faculty)
+        for classroom in faculty.assigned_classes.keys():
+            graph.add_edge(faculty, classroom)
+
+    classroom_order = {classroom: ind for ind, classroom in enumerate(classrooms)}
+    faculty_order = {faculty: ind for ind, faculty in enumerate(faculties)}
+    components = []
+    for nodes in nx.connected_components(graph):
+        component_classrooms = sorted((node for node in nodes if node in classroom_order), key=classroom_order.get)
+        component_faculties = sorted((node for node in nodes if node in faculty_order), key=faculty_order.get)
+        if component_classrooms:
+            components.append((component_classrooms, component_faculties))
+    components.sort(key=lambda component: classroom_order[component[0][0]])
+    return components
+
+
+def _run_batch(batch, engine, seed):
+    results = []
+    for data in batch:
+        classrooms, faculties = load_models(data)
+        results.append(run_seed(classrooms, faculties, engine, seed))
+    return results
+
+
+def _batches(components, workers):
+    """ Groups components into at most `workers` batches of similar total hours, largest first."""
+    batches = [[] for _ in range(min(workers, len(components)))]
+    loads = [0] * len(batches)
+    hours = [sum(faculty.remaining_hours for faculty in faculties) for _, faculties in components]
+    for ind in sorted(range(len(components)), key=lambda ind: -hours[ind]):
+        target = loads.index(min(loads))
+        batches[target].append(ind)
+        loads[target] += hours[ind]
+    return batches
+
+
+def merge_timetables(classrooms, timetables, slots_per_day=7):
+    """
+    Merges per-component timetables into one timetable over all classrooms.
+    Components that finish early are padded with free days.
+
+    Args:
+        classrooms (list): All classrooms, in output order.
+        timetables (list): One TimetableResult per component.
+        slots_per_day (int): The number of slots per day when there are no component timetables;
+            otherwise it is taken from them.
+
+    Returns:
+        TimetableResult: The merged timetable.
+
+    Raises:
+        ValueError: If the component timetables have different numbers of slots per day.
+    """
+    slot_counts = {timetable.slots_per_day for timetable in timetables}
+    if len(slot_counts) > 1:
+        raise ValueError(f"Cannot merge timetables with {sorted(slot_counts)} slots per day.")
+    slots_per_day = slot_counts.pop() if slot_counts else slots_per_day
+    days = max((timetable.days for timetable in timetables), default=0)
+    classroom_ids = {classroom.class_name: ind for ind, classroom in enumerate(classrooms)}
+    cells = np.full((days, len(classrooms), slots_per_day), FREE, dtype=np.int32)
+    course_cells = np.full_like(cells, FREE)
+    faculty_ids = {}
+    course_ids = {}
+    course_names = []
+    for timetable in timetables:
+        # Map the component's ids onto the merged tables; the trailing FREE keeps free slots free
+        faculty_map = np.array([faculty_ids.setdefault(name, len(faculty_ids)) for name in timetable.faculty_names] + [FREE])
+        course_map = []
+        for code, name in zip(timetable.course_codes, timetable.course_names):
+            if code not in course_ids:
+                course_ids[code] = len(course_ids)
+                course_names.append(name)
+            course_map.append(course_ids[code])
+        course_map = np.array(course_map + [FREE])
+        rows = [classroom_ids[name] for name in timetable.class_names]
+        cells[:timetable.days, rows, :] = faculty_map[timetable.cells]
+        course_cells[:timetable.days, rows, :] = course_map[timetable.course_cells]
+    return TimetableResult(cells, course_cells, list(classroom_ids), list(faculty_ids), list(course_ids), course_names)
+
+
+def schedule_components(classrooms, faculties, engine="greedy", workers=None, seed=None):
+    """
+    Schedules each independent faculty-classroom cluster on its own, in parallel worker
+    processes, and merges the results. With a deterministic engine the timetable is the
+    same as scheduling everything at once.
+
+    Args:
+        classrooms (list): The Classroom objects to schedule. They are not modified.
+        faculties (list): The Faculty objects with their assigned classes. They are not modified.
+        engine (str): The engine name.
+        workers (int): The number of worker processes (defaults to the CPU count).
+        seed (int): Optional seed passed to every component's engine.
+
+    Returns:
+        tuple: The merged TimetableResult and an EngineReport for the whole run.
+    """
+    start = time.perf_counter()
+    components = find_components(classrooms, faculties)
+    workers = workers or os.cpu_count() or 1
+    results = [None] * len(components)
+
+    batches = _batches(components, workers)
+    if len(batches) <= 1:
+        batch_results = [_run_batch([dump_models(*component) for component in components], engine, seed)] if components else []
+        batches = [list(range(len(components)))] if components else []
+    else:
+        with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+            futures = [
+                pool.submit(_run_batch, [dump_models(*components[ind]) for ind in batch], engine, seed)
+                for batch in batches
+            ]
+            batch_results = [future.result() for future in futures]
+    for batch, batch_result in zip(batches, batch_results):
+        for ind, result in zip(batch, batch_result):
+            results[ind] = result
+
+    timetable = merge_timetables(classrooms, [timetable for timetable, _ in results])
+    report = EngineReport(engine, timetable.days, timetable.free_slots, time.perf_counter() - start)
+    return timetable, report
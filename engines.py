@@ -0,0 +1,39 @@
+from GreedyEngine import GreedyEngine
+from DsaturEngine import DsaturEngine
+from VectorEngine import VectorEngine
+
+# Scheduling engines by name
+ENGINES = {
+    GreedyEngine.name: GreedyEngine,
+    DsaturEngine.name: DsaturEngine,
+    VectorEngine.name: VectorEngine,
+}
+
+DEFAULT_ENGINE = GreedyEngine.name
+
+
+def register_engine(engine_class):
+    """ Registers a SchedulerEngine subclass under its `name` so it can be selected by name."""
+    ENGINES[engine_class.name] = engine_class
+    return engine_class
+
+
+def available_engines():
+    """ Returns the names of the registered engines."""
+    return list(ENGINES.keys())
+
+
+def get_engine(name, seed=None):
+    """
+    Creates an engine by name.
+
+    Args:
+        name (str): The registered engine name, e.g. "greedy" or "dsatur".
+        seed (int): Optional seed for a randomised, reproducible run.
+
+    Returns:
+        SchedulerEngine: A new engine instance.
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}'. Available engines: {', '.join(available_engines())}")
+    return ENGINES[name](seed=seed)
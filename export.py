@@ -0,0 +1,289 @@
+import csv
+import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from SlotGrid import FREE
+
+FORMATS = ("pdf", "csv", "ics")
+
+# PDF layout: two breaks split the seven slots into 2 + 2 + 3
+SLOT_HEADERS = ["Day", "1", "2", "Break", "3", "4", "Break", "5", "6", "7"]
+COL_WIDTHS = [50, 135, 135, 50, 135, 135, 50, 135, 135, 135]  # Narrower Break Columns
+SLOT_COLUMNS = [1, 2, 4, 5, 7, 8, 9]
+BREAK_AFTER = (1, 3)  # Slots (0-based) followed by a break
+
+# Default period times for iCalendar export, matching the breaks above
+SLOT_TIMES = [
+    ("09:00", "09:50"), ("09:50", "10:40"),
+    ("11:00", "11:50"), ("11:50", "12:40"),
+    ("13:40", "14:30"), ("14:30", "15:20"), ("15:20", "16:10"),
+]
+
+
+def iter_tables(timetable, by="classroom", names=None):
+    """
+    Streams a timetable one classroom or faculty member at a time.
+    Only the per-classroom and per-faculty views are read, so lazily expanded timetables
+    such as WeeklyTimetable are never built in full.
+
+    Args:
+        timetable (TimetableResult): The timetable to export.
+        by (str): "classroom" for one table per classroom, "faculty" for one per faculty member.
+        names (list): Optional classroom or faculty names to export (default: all).
+
+    Yields:
+        tuple: The name, a days x slots list of labels ('free' for free slots), a matching
+            list of course codes ('' for free slots) and a days x slots integer key array
+            where equal neighbouring keys mean the same class.
+    """
+    course_table = np.array(timetable.course_codes + [''], dtype=object)
+    if by == "classroom":
+        faculty_table = np.array(timetable.faculty_names + ['free'], dtype=object)
+        for name in (timetable.class_names if names is None else names):
+            keys = timetable.classroom_view(name)
+            courses = course_table[timetable.course_view(name)]
+            yield name, faculty_table[keys].tolist(), courses.tolist(), keys
+    elif by == "faculty":
+        class_table = np.array(timetable.class_names + ['free'], dtype=object)
+        for name in (timetable.faculty_names if names is None else names):
+            days, classroom_ids, slots = timetable.faculty_view(name).T
+            keys = np.full((timetable.days, timetable.slots_per_day), FREE, dtype=np.int32)
+            keys[days, slots] = classroom_ids
+            courses = np.full(keys.shape, '', dtype=object)
+            courses[days, slots] = course_table[timetable.courses_at(days, classroom_ids, slots)]
+            yield name, class_table[keys].tolist(), courses.tolist(), keys
+    else:
+        raise ValueError(f"Unknown export grouping '{by}'. Use 'classroom' or 'faculty'.")
+
+
+def merge_spans(keys):
+    """
+    Finds runs of the same class in neighbouring slots, which the PDF shows as one merged cell.
+    Runs never cross a break.
+
+    Args:
+        keys (np.ndarray): A days x slots integer key array from `iter_tables`.
+
+    Returns:
+        list: (day, first slot, last slot) for every run longer than one slot.
+    """
+    same = keys[:, 1:] == keys[:, :-1]
+    same[:, list(BREAK_AFTER)] = False
+    spans = []
+    for day in np.flatnonzero(same.any(axis=1)).tolist():
+        start = None
+        for slot, joined in enumerate(same[day].tolist()):
+            if joined and start is None:
+                start = slot
+            elif not joined and start is not None:
+                spans.append((day, start, slot))
+                start = None
+        if start is not None:
+            spans.append((day, start, len(same[day])))
+    return spans
+
+
+def pdf_elements(name, labels, keys):
+    """ Builds the title and table flowables for one classroom or faculty member."""
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    title = Table([[name]], colWidths=[sum(COL_WIDTHS)], style=[
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 16),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ])
+
+    table_data = [SLOT_HEADERS]
+    for day, schedule in enumerate(labels):
+        table_data.append([f"Day {day + 1}"] + schedule[:2] + ["Break"] + schedule[2:4] + ["Break"] + schedule[4:])
+
+    merge_styles = []
+    for day, first, last in merge_spans(keys):
+        start, end, row = SLOT_COLUMNS[first], SLOT_COLUMNS[last], day + 1
+        merge_styles.append(('SPAN', (start, row), (end, row)))
+        merge_styles.append(('ALIGN', (start, row), (end, row), 'CENTER'))
+        merge_styles.append(('VALIGN', (start, row), (end, row), 'MIDDLE'))
+        for col in range(start + 1, end + 1):
+            table_data[row][col] = ""  # Remove redundant text in merged cells
+
+    table = Table(table_data, colWidths=COL_WIDTHS)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),  # Bigger Font
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 14),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),  # Default grid
+    ] + merge_styles + [
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),  # Ensure outer border
+    ]))
+    spacer = Table([[""]], colWidths=[sum(COL_WIDTHS)])
+    return [title, table, spacer]
+
+
+class _Story(list):
+    """ A story list that builds the next table's flowables only when the document has laid out
+    the previous ones, so a PDF holds one table's flowables at a time rather than the whole export.
+    ReportLab's `build` reads the story with `len`, indexing and deletions, which all see the refilled list.
+    """
+
+    def __init__(self, parts):
+        super().__init__()
+        self.parts = parts
+
+    def __len__(self):
+        while not list.__len__(self):
+            part = next(self.parts, None)
+            if part is None:
+                break
+            self.extend(part)
+        return list.__len__(self)
+
+
+def write_pdf(timetable, path, by="classroom", names=None):
+    """ Writes one table per classroom (or faculty member) to a landscape A3 PDF, one table at a time."""
+    from reportlab.lib.pagesizes import A3, landscape
+    from reportlab.platypus import SimpleDocTemplate
+
+    story = _Story(pdf_elements(name, labels, keys) for name, labels, _, keys in iter_tables(timetable, by, names))
+    SimpleDocTemplate(path, pagesize=landscape(A3)).build(story)
+
+
+def write_csv(timetable, path, by="classroom", names=None):
+    """ Writes one row per slot: the classroom (or faculty member), day, slot, who or where, and course."""
+    other = "faculty" if by == "classroom" else "classroom"
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow([by, "day", "slot", other, "course_code"])
+        for name, labels, courses, _ in iter_tables(timetable, by, names):
+            for day, (row, course_row) in enumerate(zip(labels, courses)):
+                writer.writerows(
+                    (name, day + 1, slot + 1, label if label != 'free' else '', course)
+                    for slot, (label, course) in enumerate(zip(row, course_row))
+                )
+
+
+def _ics_text(value):
+    return str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_line(line):
+    """ Folds a content line into 75-octet lines as RFC 5545 requires, never splitting a UTF-8 character."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    start, limit = 0, 75  # Continuation lines lose one octet to the leading space
+    while len(encoded) - start > limit:
+        end = start + limit
+        while encoded[end] & 0xC0 == 0x80:  # Back off to the start of a character
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74
+    parts.append(encoded[start:].decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def teaching_dates(start_date, days, weekdays=(0, 1, 2, 3, 4)):
+    """ Returns the calendar date of each timetable day, counting only the given weekdays (Monday is 0)."""
+    dates = []
+    date = start_date
+    while len(dates) < days:
+        if date.weekday() in weekdays:
+            dates.append(date)
+        date += datetime.timedelta(days=1)
+    return dates
+
+
+def write_ics(timetable, path, by="classroom", names=None, start_date=None, slot_times=SLOT_TIMES):
+    """
+    Writes an iCalendar file with one event per taught slot.
+
+    Args:
+        start_date (datetime.date): The date of day 1 (default: today). Days run over weekdays only.
+        slot_times (list): (start, end) "HH:MM" times of each slot.
+    """
+    dates = teaching_dates(start_date or datetime.date.today(), timetable.days)
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Schedulit//Timetable//EN\r\n")
+        for name, labels, courses, _ in iter_tables(timetable, by, names):
+            for day, (row, course_row) in enumerate(zip(labels, courses)):
+                date = dates[day].strftime("%Y%m%d")
+                for slot, (label, course) in enumerate(zip(row, course_row)):
+                    if label == 'free':
+                        continue
+                    faculty, classroom = (label, name) if by == "classroom" else (name, label)
+                    start, end = slot_times[slot]
+                    file.write(
+                        "BEGIN:VEVENT\r\n"
+                        + _ics_line(f"UID:{_ics_text(f'{date}-{slot + 1}-{classroom}')}@schedulit")
+                        + f"DTSTAMP:{stamp}\r\n"
+                        f"DTSTART:{date}T{start.replace(':', '')}00\r\n"
+                        f"DTEND:{date}T{end.replace(':', '')}00\r\n"
+                        + _ics_line(f"SUMMARY:{_ics_text(f'{course} - {faculty}' if course else faculty)}")
+                        + _ics_line(f"LOCATION:{_ics_text(classroom)}")
+                        + "END:VEVENT\r\n"
+                    )
+        file.write("END:VCALENDAR\r\n")
+
+
+WRITERS = {"pdf": write_pdf, "csv": write_csv, "ics": write_ics}
+
+# TimetableResult for the current worker process
+_worker_timetable = None
+
+
+def _init_worker(timetable):
+    global _worker_timetable
+    _worker_timetable = timetable
+
+
+def _write_chunk(fmt, path, by, names, options):
+    WRITERS[fmt](_worker_timetable, path, by=by, names=names, **options)
+    return path
+
+
+def export_timetable(timetable, path, fmt=None, by="classroom", chunk_size=None, workers=None, **options):
+    """
+    Exports a timetable without the GUI.
+    With `chunk_size`, the classrooms (or faculty) are split into files of that many tables,
+    named like `timetable_001.pdf`, so very large exports never hold everything in memory at
+    once. With `workers`, the chunks are written in parallel worker processes.
+
+    Args:
+        timetable (TimetableResult): The timetable to export.
+        path (str): The output file; the format is taken from its extension unless `fmt` is given.
+        fmt (str): "pdf", "csv" or "ics".
+        by (str): "classroom" or "faculty".
+        chunk_size (int): Optional number of tables per output file.
+        workers (int): Optional number of worker processes for chunked exports.
+        options: Extra writer options, e.g. `start_date` for iCalendar.
+
+    Returns:
+        list: The paths written.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    names = timetable.class_names if by == "classroom" else timetable.faculty_names
+    if not chunk_size or len(names) <= chunk_size:
+        WRITERS[fmt](timetable, path, by=by, **options)
+        return [path]
+
+    stem, ext = os.path.splitext(path)
+    chunks = [names[start:start + chunk_size] for start in range(0, len(names), chunk_size)]
+    paths = [f"{stem}_{ind + 1:03d}{ext or '.' + fmt}" for ind in range(len(chunks))]
+    if not workers or workers <= 1:
+        for chunk_path, chunk in zip(paths, chunks):
+            WRITERS[fmt](timetable, chunk_path, by=by, names=chunk, **options)
+        return paths
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(timetable,)) as pool:
+        return list(pool.map(_write_chunk, [fmt] * len(chunks), paths, [by] * len(chunks), chunks, [options] * len(chunks)))
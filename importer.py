@@ -0,0 +1,227 @@
+import argparse
+import csv
+import json
+import os
+import time
+
+from SchedulerDB import SchedulerDB
+
+# Columns of each table, in insert order; CSV files are matched to a table by their header
+TABLES = {
+    "classrooms": ("class_name",),
+    "courses": ("code", "name", "hours"),
+    "faculty": ("name",),
+    "assignments": ("faculty_name", "class_name", "course_code"),
+}
+MAX_ERRORS = 10  # Problems listed in a failed import's message
+
+
+class ImportReport:
+    """ What a bulk import wrote and how long it took.
+    Attributes:
+        rows (dict): Rows read per table.
+        parse_time (float): Seconds spent reading the files.
+        validate_time (float): Seconds spent checking the rows.
+        write_time (float): Seconds spent writing to the database.
+    """
+    __slots__ = ("rows", "parse_time", "validate_time", "write_time")
+
+    def __init__(self, rows, parse_time, validate_time, write_time):
+        self.rows = rows
+        self.parse_time = parse_time
+        self.validate_time = validate_time
+        self.write_time = write_time
+
+    @property
+    def total_rows(self):
+        return sum(self.rows.values())
+
+    @property
+    def runtime(self):
+        return self.parse_time + self.validate_time + self.write_time
+
+    @property
+    def rows_per_second(self):
+        return self.total_rows / self.runtime if self.runtime else 0.0
+
+    def __str__(self):
+        counts = ", ".join(f"{count} {table}" for table, count in self.rows.items())
+        return (f"imported {counts} ({self.total_rows} rows) in {self.runtime:.3f}s, "
+                f"{self.rows_per_second:,.0f} rows/s (parse {self.parse_time:.3f}s, "
+                f"validate {self.validate_time:.3f}s, write {self.write_time:.3f}s)")
+
+
+def table_for_header(header):
+    """ Returns the table whose columns match a CSV header, ignoring order and case."""
+    columns = {column.strip().lower() for column in header}
+    for table, table_columns in TABLES.items():
+        if columns == set(table_columns):
+            return table
+    raise ValueError(f"Unrecognised CSV header {list(header)}. Expected one of: "
+                     + "; ".join(", ".join(columns) for columns in TABLES.values()))
+
+
+def _row(table, record):
+    if isinstance(record, dict):
+        return tuple(record.get(column) for column in TABLES[table])
+    if isinstance(record, (list, tuple)):
+        return tuple(record)
+    return (record,)  # A bare name for single-column tables
+
+
+def read_file(path, records=None):
+    """
+    Reads a CSV or JSON file into rows per table.
+    A CSV file holds one table, recognised by its header row. A JSON file holds an object
+    with any of the keys "classrooms", "courses", "faculty" and "assignments", each a list
+    of objects with the table's columns (or plain names for classrooms and faculty).
+
+    Args:
+        path (str): The file to read.
+        records (dict): Optional rows per table to add to.
+
+    Returns:
+        dict: Lists of row tuples keyed by table, in the column order of `TABLES`.
+    """
+    records = records if records is not None else {table: [] for table in TABLES}
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return records
+            table = table_for_header(header)
+            order = [[column.strip().lower() for column in header].index(column) for column in TABLES[table]]
+            try:
+                for line in reader:
+                    if not line:
+                        continue
+                    if len(line) < len(header):
+                        raise ValueError(f"{path} line {reader.line_num}: expected {len(header)} columns "
+                                         f"({', '.join(header)}), got {len(line)}")
+                    records[table].append(tuple(line[ind] for ind in order))
+            except csv.Error as error:
+                raise ValueError(f"{path} line {reader.line_num}: {error}") from error
+    elif ext == ".json":
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path} must hold a JSON object with the keys {', '.join(TABLES)}, "
+                             f"not a {type(data).__name__}")
+        unknown = set(data) - set(TABLES)
+        if unknown:
+            raise ValueError(f"Unknown tables in {path}: {', '.join(sorted(unknown))}")
+        for table, table_records in data.items():
+            if not isinstance(table_records, list):
+                raise ValueError(f"'{table}' in {path} must be a list, not a {type(table_records).__name__}")
+            records[table].extend(_row(table, record) for record in table_records)
+    else:
+        raise ValueError(f"Cannot import '{path}'. Use .csv or .json files.")
+    return records
+
+
+def validate(records, existing):
+    """
+    Checks every row before anything is written, using set lookups instead of per-row queries.
+    Rows whose key already exists (in the database or earlier in the import) are skipped, as
+    the GUI does, and course hours are converted to integers.
+
+    Args:
+        records (dict): Rows per table from `read_file`.
+        existing (tuple): Sets of the classroom names, course codes and faculty names in the database.
+
+    Returns:
+        dict: The rows to insert per table.
+
+    Raises:
+        ValueError: If any row is malformed or an assignment refers to an unknown key.
+    """
+    errors = []
+    classrooms, courses, faculty = (set(keys) for keys in existing)
+    rows = {table: [] for table in TABLES}
+
+    def check(table, ind, row):
+        if len(row) != len(TABLES[table]) or any(value is None or str(value).strip() == "" for value in row):
+            errors.append(f"{table} row {ind + 1}: expected {', '.join(TABLES[table])}, got {list(row)}")
+            return None
+        return tuple(str(value).strip() for value in row)
+
+    for ind, row in enumerate(records["classrooms"]):
+        row = check("classrooms", ind, row)
+        if row and row[0] not in classrooms:
+            classrooms.add(row[0])
+            rows["classrooms"].append(row)
+    for ind, row in enumerate(records["courses"]):
+        row = check("courses", ind, row)
+        if not row:
+            continue
+        if not row[2].isdigit():
+            errors.append(f"courses row {ind + 1}: hours must be a whole number, got '{row[2]}'")
+        elif row[0] not in courses:
+            courses.add(row[0])
+            rows["courses"].append((row[0], row[1], int(row[2])))
+    for ind, row in enumerate(records["faculty"]):
+        row = check("faculty", ind, row)
+        if row and row[0] not in faculty:
+            faculty.add(row[0])
+            rows["faculty"].append(row)
+    for ind, row in enumerate(records["assignments"]):
+        row = check("assignments", ind, row)
+        if not row:
+            continue
+        for value, keys, kind in zip(row, (faculty, classrooms, courses), ("faculty", "classroom", "course")):
+            if value not in keys:
+                errors.append(f"assignments row {ind + 1}: unknown {kind} '{value}'")
+        rows["assignments"].append(row)
+
+    if errors:
+        shown = "\n".join(errors[:MAX_ERRORS])
+        more = f"\n... and {len(errors) - MAX_ERRORS} more" if len(errors) > MAX_ERRORS else ""
+        raise ValueError(f"Import failed with {len(errors)} problem(s):\n{shown}{more}")
+    return rows
+
+
+def import_files(db, paths, dry_run=False):
+    """
+    Imports classrooms, courses, faculty and assignments from CSV and JSON files.
+    All files are read and validated together, so assignments may refer to rows from
+    any of them, and then written in a single transaction: either everything is
+    imported or nothing is.
+
+    Args:
+        db (SchedulerDB): The database to import into.
+        paths (list): The files to import.
+        dry_run (bool): Validate only, without writing.
+
+    Returns:
+        ImportReport: The rows imported per table and the time taken.
+    """
+    start = time.perf_counter()
+    records = {table: [] for table in TABLES}
+    for path in paths:
+        read_file(path, records)
+    parsed = time.perf_counter()
+    rows = validate(records, db.keys())
+    validated = time.perf_counter()
+    if not dry_run:
+        db.bulk_insert(rows["classrooms"], rows["courses"], rows["faculty"], rows["assignments"])
+    written = time.perf_counter()
+    return ImportReport({table: len(table_rows) for table, table_rows in rows.items()},
+                        parsed - start, validated - parsed, written - validated)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import classrooms, courses, faculty and assignments from CSV or JSON files.")
+    parser.add_argument("files", nargs="+", help="CSV files (one table each, recognised by header) or JSON files")
+    parser.add_argument("--db", default="scheduler.db", help="database to import into")
+    parser.add_argument("--dry-run", action="store_true", help="validate the files without writing")
+    args = parser.parse_args()
+
+    db = SchedulerDB(args.db)
+    try:
+        print(import_files(db, args.files, dry_run=args.dry_run))
+    except ValueError as error:
+        raise SystemExit(str(error))
+    finally:
+        db.close()
@@ -0,0 +1,155 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from FacultySchedule import FacultySchedule
+from simple_scheduler import create_slots, generate_timetable
+from engines import get_engine
+from serialize import dump_models, load_models
+
+# Pickled (classrooms, faculties) for the current worker process
+_worker_data = None
+
+
+class MultiStartResult:
+    """ The best timetable found by a multi-start search.
+    Attributes:
+        timetable (TimetableResult): The best timetable, as returned by `generate_timetable`.
+        report (EngineReport): The report of the run that produced it.
+        seed (int): The seed that reproduces it (None for the engine's default order).
+        runs (int): The number of runs completed.
+    """
+    __slots__ = ("timetable", "report", "seed", "runs")
+
+    def __init__(self, timetable, report, seed, runs):
+        self.timetable = timetable
+        self.report = report
+        self.seed = seed
+        self.runs = runs
+
+    def __str__(self):
+        return f"best of {self.runs} runs (seed {self.seed}) - {self.report}"
+
+
+def score(report, seed=None):
+    """ Ranks a run: fewer days first, then fewer free slots, then the lower seed."""
+    return (report.days, report.free_slots, -1 if seed is None else seed)
+
+
+def run_seed(classrooms, faculties, engine="greedy", seed=None, metrics=None):
+    """
+    Runs one seeded engine. The classrooms and faculty are consumed by the run,
+    so pass fresh copies when they are needed again.
+
+    Args:
+        classrooms (list): The Classroom objects to schedule.
+        faculties (list): The Faculty objects with their assigned classes.
+        engine (str): The engine name.
+        seed (int): The seed for the engine's randomised orders, or None.
+        metrics (SchedulerMetrics): Optional observer for the run.
+
+    Returns:
+        tuple: The TimetableResult and the engine report.
+    """
+    G, class_slots = create_slots(classrooms)
+    engine = get_engine(engine, seed=seed)
+    timetable = generate_timetable(G, class_slots, faculties, FacultySchedule(), engine=engine, metrics=metrics)
+    return timetable, engine.report
+
+
+def stop_pool(pool):
+    """
+    Shuts a process pool down without waiting for the jobs it is running: queued jobs are
+    cancelled and the worker processes are terminated, so no work continues past a time limit.
+
+    Args:
+        pool (ProcessPoolExecutor): The pool to stop.
+    """
+    if hasattr(pool, "terminate_workers"):
+        pool.terminate_workers()
+        return
+    # Before Python 3.14 the executor does not expose its workers
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _run_worker(engine, seed):
+    classrooms, faculties = load_models(_worker_data)
+    timetable, report = run_seed(classrooms, faculties, engine, seed)
+    return seed, timetable, report
+
+
+def multistart(classrooms, faculties, engine="greedy", iterations=64, time_limit=None, workers=None, base_seed=0):
+    """
+    Runs many seeded, randomised orderings of an engine across processes and keeps the best timetable.
+    The first run uses the engine's default order, so the result is never worse than a single run.
+    Run `i` uses seed `base_seed + i`, and `run_seed` with the winning seed regenerates it exactly.
+
+    Args:
+        classrooms (list): The Classroom objects to schedule. They are not modified.
+        faculties (list): The Faculty objects with their assigned classes. They are not modified.
+        engine (str): The engine name.
+        iterations (int): The maximum number of runs.
+        time_limit (float): Optional wall-clock budget in seconds. No new runs start after it and
+            runs still going are stopped, unless no run has finished yet: the first result is waited for.
+        workers (int): The number of worker processes (defaults to the CPU count); 1 runs in this process.
+
+    Returns:
+        MultiStartResult: The best timetable found.
+    """
+    data = dump_models(classrooms, faculties)
+    seeds = [None] + [base_seed + ind for ind in range(1, iterations)]
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+    workers = workers or os.cpu_count() or 1
+    best = None
+    runs = 0
+
+    if workers <= 1:
+        # Run in this process, e.g. inside a worker of a batch that is already parallel
+        _init_worker(data)
+        while seeds and (deadline is None or best is None or time.monotonic() < deadline):
+            seed, timetable, report = _run_worker(engine, seeds.pop(0))
+            runs += 1
+            if best is None or score(report, seed) < score(best.report, best.seed):
+                best = MultiStartResult(timetable, report, seed, runs)
+        best.runs = runs
+        return best
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,))
+    pending = set()
+    try:
+        while seeds or pending:
+            # Keep every worker busy without queueing the whole budget up front; the first run
+            # always starts, even past the deadline, as in the serial loop above
+            while seeds and len(pending) < workers * 2 and (
+                    deadline is None or time.monotonic() < deadline or (best is None and not pending)):
+                pending.add(pool.submit(_run_worker, engine, seeds.pop(0)))
+            if not pending:
+                break
+            # Without a result yet, wait past the deadline for the first run to finish
+            timeout = None if deadline is None or best is None else max(0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                seed, timetable, report = future.result()
+                runs += 1
+                if best is None or score(report, seed) < score(best.report, best.seed):
+                    best = MultiStartResult(timetable, report, seed, runs)
+            if deadline is not None and time.monotonic() >= deadline and best is not None:
+                break
+    finally:
+        if pending:
+            stop_pool(pool)
+        else:
+            pool.shutdown(wait=False)
+
+    best.runs = runs
+    return best
@@ -0,0 +1,205 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from SlotGrid import FREE
+from TimetableResult import TimetableResult
+
+# Energy of a timetable: the sum of the days classes are taught on, plus a penalty per free period
+GAP_WEIGHT = 1
+START_TEMPERATURE = 1.0
+END_TEMPERATURE = 0.05
+# Share of moves that try to empty the last day
+LAST_DAY_BIAS = 0.5
+# Moves between temperature updates and best-state checks
+CHECK_INTERVAL = 4096
+
+
+def free_periods(timetable):
+    """ Counts the free periods of a timetable: free slots of a classroom's day after its first class and before its last."""
+    taught = timetable.cells != FREE
+    if not taught.size:
+        return 0
+    slots = timetable.slots_per_day
+    first = taught.argmax(axis=2)
+    last = slots - 1 - taught[:, :, ::-1].argmax(axis=2)
+    classes = taught.sum(axis=2)
+    spans = np.where(classes > 0, last - first + 1, 0)
+    return int((spans - classes).sum())
+
+
+def improve_timetable(timetable, time_limit=1.0, iterations=None, seed=None):
+    """
+    Compacts a finished timetable with simulated annealing.
+    A move takes a class to another slot of the same classroom, on a day no later than the
+    current last day, swapping it with the class there if the slot is taken. Each move is
+    checked and scored incrementally: the daily limits of `is_valid_slot_for_faculty` (at most
+    three classes a day per faculty/classroom pair, and only one day with more than one) are
+    read from per-pair day counters, conflicts from a busy table, and the energy change from
+    the two classroom-days touched. Lower energy moves classes to earlier days and closes
+    free periods, so the last days empty out and the timetable needs fewer days.
+
+    Args:
+        timetable (TimetableResult): The timetable to improve (the older list-of-strings format is also accepted).
+        time_limit (float): The search budget in seconds.
+        iterations (int): Optional number of moves to try instead of the time budget; with a seed
+            this makes the result reproducible.
+        seed (int): Optional seed for the random moves.
+
+    Returns:
+        TimetableResult: The lowest-energy timetable found. It never uses more days than the input.
+    """
+    if not isinstance(timetable, TimetableResult):
+        timetable = TimetableResult.from_strings(timetable)
+    days, classroom_count, slots = timetable.cells.shape
+    if not days:
+        return timetable
+    rng = random.Random(seed)
+    day_size = classroom_count * slots
+    faculty_count = len(timetable.faculty_names)
+
+    # Every cell holds the id of its faculty/classroom pair; the pair determines the faculty and course
+    pair_ids = {}
+    pair_faculty = []
+    pair_course = []
+    pairs = [FREE] * (days * day_size)
+    course_cells = timetable.course_cells.ravel().tolist()
+    for ind, faculty_id in enumerate(timetable.cells.ravel().tolist()):
+        if faculty_id == FREE:
+            continue
+        key = (faculty_id, ind // slots % classroom_count)
+        if key not in pair_ids:
+            pair_ids[key] = len(pair_faculty)
+            pair_faculty.append(faculty_id)
+            pair_course.append(course_cells[ind])
+        pairs[ind] = pair_ids[key]
+
+    # Classes per pair and day, days with two or more classes per pair, and busy faculty by day and slot
+    counts = bytearray(len(pair_faculty) * days)
+    doubles = [0] * len(pair_faculty)
+    busy = bytearray(days * slots * faculty_count)
+    day_positions = [[] for _ in range(days)]
+    where = [FREE] * len(pairs)
+    energy = 0
+    for ind, pair in enumerate(pairs):
+        if pair == FREE:
+            continue
+        day = ind // day_size
+        counts[pair * days + day] += 1
+        if counts[pair * days + day] == 2:
+            doubles[pair] += 1
+        busy[(day * slots + ind % slots) * faculty_count + pair_faculty[pair]] = 1
+        where[ind] = len(day_positions[day])
+        day_positions[day].append(ind)
+        energy += day
+
+    def gaps(start):
+        row = [ind for ind in range(slots) if pairs[start + ind] != FREE]
+        return row[-1] - row[0] + 1 - len(row) if row else 0
+
+    energy += GAP_WEIGHT * sum(gaps(start) for start in range(0, len(pairs), slots))
+
+    def can_shift(pair, source, target):
+        base = pair * days
+        target_count = counts[base + target]
+        if target_count == 3:
+            return False
+        return doubles[pair] - (counts[base + source] == 2) + (target_count == 1) <= 1
+
+    def shift(pair, source, target):
+        base = pair * days
+        if counts[base + source] == 2:
+            doubles[pair] -= 1
+        counts[base + source] -= 1
+        counts[base + target] += 1
+        if counts[base + target] == 2:
+            doubles[pair] += 1
+
+    last = days
+    while last and not day_positions[last - 1]:
+        last -= 1
+    best = (last, energy)
+    best_pairs = list(pairs)
+    temperature = START_TEMPERATURE
+    start = time.perf_counter()
+    moves = 0
+    while last:
+        moves += 1
+        if moves % CHECK_INTERVAL == 0:
+            progress = moves / iterations if iterations else (time.perf_counter() - start) / time_limit
+            if progress >= 1:
+                break
+            temperature = START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** progress
+            if (last, energy) < best:
+                best = (last, energy)
+                best_pairs = list(pairs)
+
+        # Pick a class, favouring the last day, and a slot of its classroom to move it to
+        source_day = last - 1 if rng.random() < LAST_DAY_BIAS else rng.randrange(last)
+        positions = day_positions[source_day]
+        if not positions:
+            continue
+        a = positions[rng.randrange(len(positions))]
+        target_day = rng.randrange(last)
+        b = target_day * day_size + (a - source_day * day_size) // slots * slots + rng.randrange(slots)
+        first, second = pairs[a], pairs[b]
+        if first == second:
+            continue
+        source_slot, target_slot = a % slots, b % slots
+        first_faculty = pair_faculty[first]
+        if busy[(target_day * slots + target_slot) * faculty_count + first_faculty]:
+            continue
+        if second != FREE:
+            second_faculty = pair_faculty[second]
+            if busy[(source_day * slots + source_slot) * faculty_count + second_faculty]:
+                continue
+        if source_day != target_day:
+            if not can_shift(first, source_day, target_day):
+                continue
+            if second != FREE and not can_shift(second, target_day, source_day):
+                continue
+
+        # Score the move on the two classroom-days it touches
+        a_row, b_row = a - source_slot, b - target_slot
+        before = gaps(a_row) + (gaps(b_row) if b_row != a_row else 0)
+        pairs[a], pairs[b] = second, first
+        after = gaps(a_row) + (gaps(b_row) if b_row != a_row else 0)
+        delta = GAP_WEIGHT * (after - before) + (target_day - source_day if second == FREE else 0)
+        if delta > 0 and rng.random() >= math.exp(-delta / temperature):
+            pairs[a], pairs[b] = first, second
+            continue
+
+        energy += delta
+        busy[(source_day * slots + source_slot) * faculty_count + first_faculty] = 0
+        busy[(target_day * slots + target_slot) * faculty_count + first_faculty] = 1
+        if second != FREE:
+            busy[(target_day * slots + target_slot) * faculty_count + second_faculty] = 0
+            busy[(source_day * slots + source_slot) * faculty_count + second_faculty] = 1
+        if source_day != target_day:
+            shift(first, source_day, target_day)
+            if second != FREE:
+                shift(second, target_day, source_day)
+        if second == FREE:
+            # The class leaves cell a for cell b
+            moved = positions.pop()
+            if moved != a:
+                positions[where[a]] = moved
+                where[moved] = where[a]
+            where[b] = len(day_positions[target_day])
+            day_positions[target_day].append(b)
+            while last and not day_positions[last - 1]:
+                last -= 1
+
+    if (last, energy) < best:
+        best = (last, energy)
+        best_pairs = pairs
+    last = best[0]
+    shape = (days, classroom_count, slots)
+    pair_table = np.array(best_pairs, dtype=np.int64).reshape(shape)[:last]
+    # Index FREE (-1) picks the trailing FREE of each table
+    cells = np.array(pair_faculty + [FREE], dtype=np.int32)[pair_table]
+    course_cells = np.array(pair_course + [FREE], dtype=np.int32)[pair_table]
+    return TimetableResult(cells, course_cells, timetable.class_names, timetable.faculty_names,
+                           timetable.course_codes, timetable.course_names)
@@ -0,0 +1,36 @@
+import contextlib
+import cProfile
+import io
+import pstats
+
+
+@contextlib.contextmanager
+def profiled(path=None, enabled=True):
+    """
+    Runs the enclosed code under cProfile.
+
+    Args:
+        path (str): Optional file to dump the stats to, for `python -m pstats` or snakeviz.
+        enabled (bool): Set to False to run the code without profiling.
+
+    Yields:
+        cProfile.Profile: The profiler, or None when disabled.
+    """
+    if not enabled:
+        yield None
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        if path:
+            profile.dump_stats(path)
+
+
+def top_functions(profile, limit=15, sort="cumulative"):
+    """ Returns the `limit` most expensive functions of a profile as printable text."""
+    out = io.StringIO()
+    pstats.Stats(profile, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,131 @@
+import numpy as np
+
+from SlotGrid import FREE
+from TimetableResult import TimetableResult
+
+
+def can_teach(counts, day):
+    """
+    Checks the daily-limit rules of `is_valid_slot_for_faculty` for one more class.
+    A faculty member teaches at most three classes a day in a classroom, and only
+    one day of the term may have more than one.
+
+    Args:
+        counts (dict): Classes per day for one faculty/classroom pair.
+        day (int): The day index the class would be added to.
+    """
+    count = counts.get(day, 0) + 1
+    if count > 3:
+        return False
+    if count >= 2:
+        return not any(other != day and other_count >= 2 for other, other_count in counts.items())
+    return True
+
+
+def repair_timetable(timetable, classrooms, faculties, affected=None):
+    """
+    Updates an existing timetable after the data changed, without regenerating it.
+    Each faculty/classroom pair is reconciled with the updated assignments: classes of
+    removed assignments are freed, surplus classes are freed from the latest days, and
+    missing hours are placed in the earliest free slots that keep the daily limits and
+    faculty conflicts valid, adding days at the end if needed. Every other cell is kept.
+
+    Args:
+        timetable (TimetableResult): The existing timetable (the older list-of-strings format is also accepted).
+        classrooms (list): The updated Classroom objects.
+        faculties (list): The updated Faculty objects; the target hours of each
+            assignment are its course's `course_hours`.
+        affected (iterable): Optional faculty and classroom names to limit the repair to.
+
+    Returns:
+        TimetableResult: The repaired timetable.
+    """
+    if not isinstance(timetable, TimetableResult):
+        timetable = TimetableResult.from_strings(timetable)
+    affected = set(affected) if affected is not None else None
+    class_names = [classroom.class_name for classroom in classrooms]
+    faculty_names = list(timetable.faculty_names)
+    faculty_ids = {name: ind for ind, name in enumerate(faculty_names)}
+    course_codes = list(timetable.course_codes)
+    course_names = list(timetable.course_names)
+    course_ids = {code: ind for ind, code in enumerate(course_codes)}
+    slots_per_day = timetable.slots_per_day
+
+    # Keep the rows of existing classrooms and add free rows for new ones
+    cells = np.full((timetable.days, len(class_names), slots_per_day), FREE, dtype=np.int32)
+    course_cells = np.full_like(cells, FREE)
+    old_ids = {name: ind for ind, name in enumerate(timetable.class_names)}
+    for classroom_id, class_name in enumerate(class_names):
+        if class_name in old_ids:
+            cells[:, classroom_id, :] = timetable.cells[:, old_ids[class_name], :]
+            course_cells[:, classroom_id, :] = timetable.course_cells[:, old_ids[class_name], :]
+
+    # Target hours and course of every assignment, by (faculty id, classroom id)
+    targets = {}
+    classroom_ids = {name: ind for ind, name in enumerate(class_names)}
+    for faculty in faculties:
+        for classroom, (course, _) in faculty.assigned_classes.items():
+            if classroom.class_name not in classroom_ids:
+                continue
+            faculty_id = faculty_ids.setdefault(faculty.name, len(faculty_ids))
+            if faculty_id == len(faculty_names):
+                faculty_names.append(faculty.name)
+            if course.code not in course_ids:
+                course_ids[course.code] = len(course_codes)
+                course_codes.append(course.code)
+                course_names.append(course.name)
+            targets[(faculty_id, classroom_ids[classroom.class_name])] = (course.course_hours, course_ids[course.code])
+
+    def is_affected(pair):
+        return affected is None or faculty_names[pair[0]] in affected or class_names[pair[1]] in affected
+
+    # Cells of every pair already in the timetable, in day order, and who is busy when
+    pair_cells = {}
+    for day, classroom_id, slot in np.argwhere(cells != FREE).tolist():
+        pair_cells.setdefault((int(cells[day, classroom_id, slot]), classroom_id), []).append((day, slot))
+    busy = [[set(cells[day, :, slot].tolist()) for slot in range(slots_per_day)] for day in range(cells.shape[0])]
+
+    # Free removed assignments and surplus classes, latest first
+    for pair, used in pair_cells.items():
+        if not is_affected(pair):
+            continue
+        surplus = len(used) - targets.get(pair, (0, FREE))[0]
+        if surplus > 0:
+            for day, slot in used[-surplus:]:
+                cells[day, pair[1], slot] = FREE
+                course_cells[day, pair[1], slot] = FREE
+                busy[day][slot].discard(pair[0])
+            del used[-surplus:]
+
+    # Place missing hours in the earliest valid free slots
+    for pair, (hours, course_id) in targets.items():
+        if not is_affected(pair):
+            continue
+        faculty_id, classroom_id = pair
+        counts = {}
+        for day, _ in pair_cells.get(pair, []):
+            counts[day] = counts.get(day, 0) + 1
+        missing = hours - len(pair_cells.get(pair, []))
+        day = 0
+        while missing > 0:
+            if day == cells.shape[0]:
+                free_day = np.full((1, len(class_names), slots_per_day), FREE, dtype=np.int32)
+                cells = np.concatenate([cells, free_day])
+                course_cells = np.concatenate([course_cells, free_day])
+                busy.append([set() for _ in range(slots_per_day)])
+            for slot in range(slots_per_day):
+                if missing == 0 or not can_teach(counts, day):
+                    break
+                if cells[day, classroom_id, slot] == FREE and faculty_id not in busy[day][slot]:
+                    cells[day, classroom_id, slot] = faculty_id
+                    course_cells[day, classroom_id, slot] = course_id
+                    busy[day][slot].add(faculty_id)
+                    counts[day] = counts.get(day, 0) + 1
+                    missing -= 1
+            day += 1
+
+    # Drop trailing days that have become completely free
+    days = cells.shape[0]
+    while days and (cells[days - 1] == FREE).all():
+        days -= 1
+    return TimetableResult(cells[:days], course_cells[:days], class_names, faculty_names, course_codes, course_names)
@@ -0,0 +1,97 @@
+import pickle
+
+from Faculty import Faculty
+from Classroom import Classroom
+from Course import Course
+
+
+def dump_models(classrooms, faculties):
+    """
+    Pickles classrooms and faculty for another thread or process.
+    Faculty and classrooms refer to each other, so pickling the objects directly recurses
+    along every chain of shared faculty and overflows the stack on large institutions.
+    The models are flattened into index tables first; `load_models` rebuilds them with the
+    same assignment order, remaining hours and shared [course, hours] lists.
+
+    Args:
+        classrooms (list): The Classroom objects.
+        faculties (list): The Faculty objects with their assigned classes.
+
+    Returns:
+        bytes: The pickled tables.
+    """
+    classroom_ids = {}
+    faculty_ids = {}
+    course_ids = {}
+    all_classrooms = []
+    all_faculties = []
+    courses = []
+
+    def classroom_id(classroom):
+        if classroom not in classroom_ids:
+            classroom_ids[classroom] = len(all_classrooms)
+            all_classrooms.append(classroom)
+        return classroom_ids[classroom]
+
+    def faculty_id(faculty):
+        if faculty not in faculty_ids:
+            faculty_ids[faculty] = len(all_faculties)
+            all_faculties.append(faculty)
+        return faculty_ids[faculty]
+
+    def course_id(course):
+        if course not in course_ids:
+            course_ids[course] = len(courses)
+            courses.append((course.name, course.code, course.course_hours))
+        return course_ids[course]
+
+    for classroom in classrooms:
+        classroom_id(classroom)
+    for faculty in faculties:
+        faculty_id(faculty)
+
+    # Walk both sides until every linked object has an id
+    classroom_rows = []
+    faculty_rows = []
+    while len(classroom_rows) < len(all_classrooms) or len(faculty_rows) < len(all_faculties):
+        while len(faculty_rows) < len(all_faculties):
+            faculty = all_faculties[len(faculty_rows)]
+            faculty_rows.append((faculty.name, faculty.remaining_hours, [
+                (classroom_id(classroom), course_id(course), hours)
+                for classroom, (course, hours) in faculty.assigned_classes.items()
+            ]))
+        while len(classroom_rows) < len(all_classrooms):
+            classroom = all_classrooms[len(classroom_rows)]
+            classroom_rows.append((
+                classroom.class_name,
+                [faculty_id(faculty) for faculty in classroom.assigned_faculty.keys()],
+                [faculty_id(slot) if isinstance(slot, Faculty) else slot for slot in classroom.class_slots],
+            ))
+    return pickle.dumps((len(classrooms), len(faculties), classroom_rows, faculty_rows, courses))
+
+
+def load_models(data):
+    """
+    Rebuilds the classrooms and faculty pickled by `dump_models`.
+
+    Returns:
+        tuple: The Classroom objects and the Faculty objects, in their original order.
+    """
+    classroom_count, faculty_count, classroom_rows, faculty_rows, course_rows = pickle.loads(data)
+    courses = [Course(name, code, hours) for name, code, hours in course_rows]
+    classrooms = [Classroom(name) for name, _, _ in classroom_rows]
+    faculties = [Faculty(name) for name, _, _ in faculty_rows]
+    assignments = {}
+    for faculty, (_, remaining_hours, classes) in zip(faculties, faculty_rows):
+        for classroom_id, course_id, hours in classes:
+            # The faculty and classroom share the same [course, hours] list, as in Faculty.add_classes
+            assignment = [courses[course_id], hours]
+            faculty.assigned_classes[classrooms[classroom_id]] = assignment
+            assignments[(classroom_id, faculty)] = assignment
+        faculty.remaining_hours = remaining_hours
+    for classroom_id, (classroom, (_, faculty_ids, class_slots)) in enumerate(zip(classrooms, classroom_rows)):
+        for faculty_id in faculty_ids:
+            faculty = faculties[faculty_id]
+            classroom.assigned_faculty[faculty] = assignments.get((classroom_id, faculty))
+        classroom.class_slots = [faculties[slot] if isinstance(slot, int) else slot for slot in class_slots]
+    return classrooms[:classroom_count], faculties[:faculty_count]
@@ -0,0 +1,458 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from SchedulerDB import SchedulerDB
+from TimetableCache import TimetableCache
+from WeeklyTimetable import WeeklyTimetable
+from engines import available_engines, DEFAULT_ENGINE
+from multistart import run_seed
+from optimize import improve_timetable
+from serialize import dump_models, load_models
+from weekly import weekly_timetable
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+# Job settings and their defaults
+DEFAULT_SETTINGS = {"engine": DEFAULT_ENGINE, "seed": None, "improve": None, "weeks": None, "week_days": 5}
+
+
+class ServiceError(Exception):
+    """ An error answered with an HTTP status."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def run_job(data, engine, seed, improve, weeks, week_days):
+    """
+    Runs one job in a worker process.
+
+    Args:
+        data (bytes): The classrooms and faculty from `serialize.dump_models`.
+        engine, seed, improve, weeks, week_days: The job settings, see `SchedulerService.submit`.
+
+    Returns:
+        tuple: The TimetableResult (or WeeklyTimetable) and the EngineReport.
+    """
+    classrooms, faculties = load_models(data)
+    if weeks:
+        return weekly_timetable(classrooms, faculties, weeks, week_days=week_days, engine=engine, seed=seed,
+                                improve=improve)
+    timetable, report = run_seed(classrooms, faculties, engine, seed)
+    if improve:
+        timetable = improve_timetable(timetable, time_limit=improve, seed=seed)
+    return timetable, report
+
+
+def timetable_json(timetable):
+    """ Converts a timetable to plain JSON values; a WeeklyTimetable is sent as its week, number of weeks
+    and the weeks each week cell is taught."""
+    grids = timetable.week if isinstance(timetable, WeeklyTimetable) else timetable
+    result = {
+        "days": timetable.days,
+        "free_slots": timetable.free_slots,
+        "class_names": grids.class_names,
+        "faculty_names": grids.faculty_names,
+        "course_codes": grids.course_codes,
+        "course_names": grids.course_names,
+        "cells": grids.cells.tolist(),
+        "course_cells": grids.course_cells.tolist(),
+    }
+    if isinstance(timetable, WeeklyTimetable):
+        result["weeks"] = timetable.weeks
+        if timetable.taught_weeks is not None:
+            result["taught_weeks"] = timetable.taught_weeks.tolist()
+    return result
+
+
+class Job:
+    """ A scheduling job and its result.
+    Attributes:
+        id (int): The job id.
+        key (tuple): The hash of the job's data and settings; identical jobs share it.
+        settings (dict): The engine settings, see `DEFAULT_SETTINGS`.
+        status (str): "queued", "running", "done" or "error".
+        requests (int): Submissions answered by this job, including merged duplicates.
+        cached (bool): Whether the result came from the timetable cache.
+        timetable (TimetableResult): The result once done.
+        report (EngineReport): The engine report once done.
+        error (str): The error message if the job failed.
+    """
+    def __init__(self, job_id, key, settings, data):
+        self.id = job_id
+        self.key = key
+        self.settings = settings
+        self.data = data
+        self.status = "queued"
+        self.requests = 1
+        self.cached = False
+        self.timetable = None
+        self.report = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._update = asyncio.Event()
+
+    @property
+    def done(self):
+        return self.status in ("done", "error")
+
+    def next_update(self):
+        """ Returns an event that is set at the job's next status change."""
+        return self._update
+
+    async def wait(self):
+        """ Waits until the job is done or has failed."""
+        while not self.done:
+            await self._update.wait()
+
+    def set_status(self, status):
+        self.status = status
+        if status == "running":
+            self.started = time.time()
+        elif status in ("done", "error"):
+            self.finished = time.time()
+            self.data = None
+        # Wake everyone waiting for this change and start a new event for the next one
+        self._update.set()
+        self._update = asyncio.Event()
+
+    def finish(self, timetable, report, cached=False):
+        self.timetable, self.report, self.cached = timetable, report, cached
+        self.set_status("done")
+
+    def fail(self, error):
+        self.error = error
+        self.set_status("error")
+
+    def to_dict(self):
+        """ Returns the job's status as plain JSON values."""
+        info = {"id": self.id, "status": self.status, "settings": self.settings, "requests": self.requests,
+                "cached": self.cached, "submitted": self.submitted, "started": self.started, "finished": self.finished}
+        if self.status == "done":
+            info.update(engine=self.report.engine, days=self.timetable.days, free_slots=self.timetable.free_slots,
+                        runtime=self.report.runtime)
+        elif self.status == "error":
+            info["error"] = self.error
+        return info
+
+
+class SchedulerService:
+    """ A local HTTP/JSON scheduling service over one scheduler.db.
+    Jobs wait in an asyncio queue and run in a bounded process pool. Each job schedules the
+    data as it was when the job was submitted. Identical jobs, on the same data with the same
+    settings, are merged while one is queued or running, and finished plain engine runs are
+    stored in the database's TimetableCache.
+
+    Endpoints:
+        POST /jobs                   Submit a job; the JSON body holds settings from `DEFAULT_SETTINGS`.
+        GET  /jobs                   List the jobs.
+        GET  /jobs/<id>              A job's status.
+        GET  /jobs/<id>/result       The timetable once done (202 with the status until then).
+        GET  /jobs/<id>/events       Server-sent events: every status change, then the result.
+        GET  /health                 Queue and pool counts.
+
+    Attributes:
+        db (SchedulerDB): The database jobs are read from.
+        cache (TimetableCache): Stored timetables, or None.
+        workers (int): The size of the worker pool.
+        executor (Executor): The pool jobs run in; by default a ProcessPoolExecutor of `workers`
+            processes, created by `start`. A ThreadPoolExecutor keeps everything in one process.
+        max_queue (int): Jobs that may wait before submissions are refused.
+        keep_jobs (int): Finished jobs kept for polling.
+        jobs (dict): Jobs by id, oldest first.
+        port (int): The port listened on once `start` has run.
+    """
+    def __init__(self, db_path="scheduler.db", workers=None, max_queue=64, keep_jobs=256, cache=True, executor=None):
+        self.db = SchedulerDB(db_path)
+        self.cache = TimetableCache(self.db.conn) if cache else None
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.keep_jobs = keep_jobs
+        self.executor = executor
+        self.jobs = {}
+        self.active = {}
+        self.ids = itertools.count(1)
+        self.queue = None
+        self.server = None
+        self.port = None
+        self.dispatchers = []
+        self.data_version = None
+        self.models = None
+        self.keys = {}
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """ Starts the workers and, unless `port` is None, the HTTP server (port 0 picks a free port)."""
+        if self.executor is None:
+            # Forked workers would inherit open client sockets and keep those connections from closing
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.queue = asyncio.Queue(self.max_queue)
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        if port is not None:
+            self.server = await asyncio.start_server(self.handle, host, port)
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """ Stops the server and the workers; queued jobs are dropped."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        self.db.close()
+
+    def snapshot(self):
+        """ Returns the current classrooms, faculty and their pickled form, reloading them only after the database changed."""
+        # data_version changes whenever another connection commits to the file
+        version = self.db.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self.models is None or version != self.data_version:
+            classroom_map, _, faculty_map = self.db.load()
+            classrooms, faculties = list(classroom_map.values()), list(faculty_map.values())
+            self.models = (classrooms, faculties, dump_models(classrooms, faculties))
+            self.data_version = version
+            self.keys = {}
+        return self.models
+
+    def submit(self, settings=None):
+        """
+        Submits a job, or joins the identical job already queued or running.
+
+        Args:
+            settings (dict): Any of "engine", "seed", "improve" (seconds of local search; weekly jobs
+                use the `weekly` default when it is not given),
+                "weeks" and "week_days" (weekly-pattern mode); the rest take `DEFAULT_SETTINGS`.
+
+        Returns:
+            Job: The job answering the submission.
+
+        Raises:
+            ServiceError: 400 for invalid settings, 503 when the queue is full.
+        """
+        settings = self.validate(settings or {})
+        classrooms, faculties, data = self.snapshot()
+        data_key = self.keys.get((settings["engine"], settings["seed"]))
+        if data_key is None:
+            data_key = TimetableCache.key(classrooms, faculties, engine=settings["engine"], seed=settings["seed"])
+            self.keys[(settings["engine"], settings["seed"])] = data_key
+        key = (data_key, settings["improve"], settings["weeks"], settings["week_days"])
+        if key in self.active:
+            job = self.active[key]
+            job.requests += 1
+            return job
+
+        job = Job(next(self.ids), key, settings, data)
+        cached = self.cache.get(data_key) if self.cacheable(job) else None
+        if cached:
+            job.finish(*cached, cached=True)
+        else:
+            try:
+                self.queue.put_nowait(job)
+            except asyncio.QueueFull:
+                raise ServiceError(503, f"The queue is full ({self.max_queue} jobs). Try again later.")
+            self.active[key] = job
+        self.jobs[job.id] = job
+        self._forget_old_jobs()
+        return job
+
+    @staticmethod
+    def validate(settings):
+        """ Checks job settings and fills in the defaults."""
+        if not isinstance(settings, dict):
+            raise ServiceError(400, "The job must be a JSON object.")
+        unknown = set(settings) - set(DEFAULT_SETTINGS)
+        if unknown:
+            raise ServiceError(400, f"Unknown settings: {', '.join(sorted(unknown))}.")
+        settings = dict(DEFAULT_SETTINGS, **settings)
+        if settings["engine"] not in available_engines():
+            raise ServiceError(400, f"Unknown engine '{settings['engine']}'. Available engines: {', '.join(available_engines())}")
+        for name, minimum in (("seed", None), ("weeks", 1), ("week_days", 1)):
+            value = settings[name]
+            if value is None and name != "week_days":
+                continue
+            if not isinstance(value, int) or isinstance(value, bool) or (minimum is not None and value < minimum):
+                raise ServiceError(400, f"'{name}' must be an integer{f' of at least {minimum}' if minimum else ''}.")
+        improve = settings["improve"]
+        if improve is not None and (not isinstance(improve, (int, float)) or isinstance(improve, bool) or improve < 0):
+            raise ServiceError(400, "'improve' must be a number of seconds.")
+        if improve is None and not settings["weeks"]:
+            settings["improve"] = 0  # Only weekly jobs have a default search time
+        return settings
+
+    def cacheable(self, job):
+        """ Plain engine runs are stored in the timetable cache; improved and weekly runs are not."""
+        return self.cache is not None and not job.settings["weeks"] and not job.settings["improve"]
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_jobs)]:
+            del self.jobs[job_id]
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.set_status("running")
+            try:
+                settings = job.settings
+                timetable, report = await loop.run_in_executor(
+                    self.executor, run_job, job.data, settings["engine"], settings["seed"], settings["improve"],
+                    settings["weeks"], settings["week_days"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                job.fail(f"{type(error).__name__}: {error}")
+            else:
+                job.finish(timetable, report)
+                if self.cacheable(job):
+                    # The cache is best-effort: another writer may hold the database lock
+                    try:
+                        self.cache.put(job.key[0], timetable, report, settings=settings["engine"])
+                    except Exception:
+                        pass
+            finally:
+                self.active.pop(job.key, None)
+                self.queue.task_done()
+
+    def health(self):
+        running = sum(job.status == "running" for job in self.jobs.values())
+        return {"status": "ok", "queued": self.queue.qsize(), "running": running, "workers": self.workers,
+                "jobs": len(self.jobs)}
+
+    def get_job(self, job_id):
+        try:
+            return self.jobs[int(job_id)]
+        except (KeyError, ValueError):
+            raise ServiceError(404, f"No job '{job_id}'.")
+
+    async def handle(self, reader, writer):
+        """ Serves one HTTP request and closes the connection."""
+        try:
+            try:
+                method, target, body = await self.read_request(reader)
+                await self.route(method, urlsplit(target).path.rstrip("/"), body, writer)
+            except ServiceError as error:
+                self.respond(writer, error.status, {"error": str(error)})
+            except Exception as error:
+                self.respond(writer, 500, {"error": f"{type(error).__name__}: {error}"})
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def read_request(reader):
+        """ Reads the request line, headers and body of an HTTP/1.1 request."""
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ServiceError(400, "Malformed HTTP request.")
+        if length > MAX_BODY:
+            raise ServiceError(413, f"The body is larger than {MAX_BODY} bytes.")
+        try:
+            body = await reader.readexactly(length) if length else b""
+        except asyncio.IncompleteReadError:
+            raise ServiceError(400, "The body is shorter than its Content-Length.")
+        return method.upper(), target, body
+
+    async def route(self, method, path, body, writer):
+        parts = path.strip("/").split("/")
+        if parts == ["health"] and method == "GET":
+            self.respond(writer, 200, self.health())
+        elif parts == ["jobs"] and method == "POST":
+            try:
+                settings = json.loads(body or b"{}")
+            except ValueError:
+                raise ServiceError(400, "The body is not valid JSON.")
+            job = self.submit(settings)
+            self.respond(writer, 200 if job.done else 202, job.to_dict(), [f"Location: /jobs/{job.id}"])
+        elif parts == ["jobs"] and method == "GET":
+            self.respond(writer, 200, [job.to_dict() for job in self.jobs.values()])
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            if method != "GET":
+                raise ServiceError(405, f"{method} is not supported on {path}.")
+            job = self.get_job(parts[1])
+            view = parts[2] if len(parts) == 3 else None
+            if view is None:
+                self.respond(writer, 200, job.to_dict())
+            elif view == "result":
+                if job.status == "done":
+                    self.respond(writer, 200, dict(job.to_dict(), timetable=timetable_json(job.timetable)))
+                else:
+                    self.respond(writer, 500 if job.status == "error" else 202, job.to_dict())
+            elif view == "events":
+                await self.stream(job, writer)
+            else:
+                raise ServiceError(404, f"No resource '{path}'.")
+        else:
+            raise ServiceError(404 if method in ("GET", "POST") else 405, f"No resource '{method} {path}'.")
+
+    @staticmethod
+    def respond(writer, status, payload, headers=()):
+        """ Writes a JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {REASONS[status]}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", "Connection: close", *headers]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    @staticmethod
+    async def stream(job, writer):
+        """ Streams a job's status changes as server-sent events, ending with its result or error."""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+        status = None
+        while True:
+            update = job.next_update()
+            if job.status != status:
+                status = job.status
+                writer.write(f"event: status\ndata: {json.dumps(job.to_dict())}\n\n".encode("utf-8"))
+                await writer.drain()
+            if job.done:
+                break
+            await update.wait()
+        if job.status == "done":
+            writer.write(f"event: result\ndata: {json.dumps(timetable_json(job.timetable))}\n\n".encode("utf-8"))
+
+
+async def serve(db_path, host, port, workers, max_queue):
+    service = SchedulerService(db_path, workers=workers, max_queue=max_queue)
+    await service.start(host, port)
+    print(f"Scheduling {db_path} on http://{host}:{service.port} with {service.workers} workers")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve timetable generation for a scheduler database over local HTTP/JSON.")
+    parser.add_argument("--db", default="scheduler.db", help="the scheduler database")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="the port to listen on (0 picks a free one)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=64, help="jobs that may wait before submissions are refused")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.workers, args.max_queue))
+    except KeyboardInterrupt:
+        pass
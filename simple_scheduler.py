@@ -1,12 +1,15 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 import networkx as nx
-import matplotlib.pyplot as plt
 
 from ClassSlots import ClassSlots
 from Faculty import Faculty
 from Classroom import Classroom
 from Course import Course
+from FacultySchedule import FacultySchedule
 
-def is_valid_slot_for_faculty(faculty, class_slot, day, faculty_schedule, G):
+def is_valid_slot_for_faculty(faculty, class_slot, day, faculty_schedule, conflicts):
     """
     Checks if a faculty member can be assigned to a given class slot.
 
@@ -14,16 +17,16 @@ def is_valid_slot_for_faculty(faculty, class_slot, day, faculty_schedule, G):
         faculty (Faculty): The faculty member to check.
         class_slot (ClassSlots): The class slot to check against.
         day (int): The current day being scheduled.
-        faculty_schedule (dict): Tracks faculty assignments per day.
-        G (nx.Graph): The graph representing the schedule.
+        faculty_schedule (FacultySchedule): Tracks faculty classes per classroom per day.
+        conflicts (ConflictEngine): Tracks the timeslots each faculty member is busy in today.
 
     Returns:
         bool: True if the faculty member can be assigned, False otherwise.
     """
     course_hours = faculty.assigned_classes[class_slot.classroom][1] > 0
-    faculty_not_going_other_class = faculty.name not in [key.faculty.name for key in G.neighbors(class_slot)]
-    count_today = faculty_schedule[faculty][class_slot.classroom].count(day)
-    had_two_classes_before = any(faculty_schedule[faculty][class_slot.classroom].count(i) > 1 for i in range(1, day))
+    faculty_not_going_other_class = not conflicts.is_busy(faculty, class_slot.timeslot)
+    count_today = faculty_schedule.count_today(faculty, class_slot.classroom, day)
+    had_two_classes_before = faculty_schedule.had_double_day(faculty, class_slot.classroom, day)
     if count_today == 3:
         return False  # Already assigned two classes today
     if count_today == 1 and had_two_classes_before:
@@ -31,24 +34,67 @@ def is_valid_slot_for_faculty(faculty, class_slot, day, faculty_schedule, G):
     
     return course_hours and faculty_not_going_other_class
 
+def rejection_reason(faculty, class_slot, day, faculty_schedule, conflicts):
+    """
+    Explains why `is_valid_slot_for_faculty` rejects a faculty member for a slot.
+    Rules are checked in the same order, so the result is None exactly when the slot is valid.
+
+    Returns:
+        str: "daily_cap", "double_day", "hours_exhausted" or "conflict", or None if the slot is valid.
+    """
+    count_today = faculty_schedule.count_today(faculty, class_slot.classroom, day)
+    if count_today == 3:
+        return "daily_cap"
+    if count_today == 1 and faculty_schedule.had_double_day(faculty, class_slot.classroom, day):
+        return "double_day"
+    if faculty.assigned_classes[class_slot.classroom][1] <= 0:
+        return "hours_exhausted"
+    if conflicts.is_busy(faculty, class_slot.timeslot):
+        return "conflict"
+    return None
+
 def is_hours_remaining(faculties):
     """ Check if there are any hours remaining for any faculty member in the entire schedule."""
-    for faculty in faculties:
-        for classroom in faculty.assigned_classes.keys():
-            if faculty.assigned_classes[classroom][1] > 0:
-                return True
-    return False
+    return any(faculty.remaining_hours > 0 for faculty in faculties)
 
-def save_graph(graph, day):
+def graph_snapshot(graph):
     """
-    Saves the current graph `G` as a PNG image.
+    Converts a day's graph into plain labels and edges that can be sent to another process.
 
     Args:
-        graph (nx.Graph): The NetworkX graph to visualize.
+        graph (nx.Graph): The NetworkX graph of the day's slots.
+
+    Returns:
+        tuple: A list of node labels and a list of edges as pairs of node indices.
+    """
+    index = {node: ind for ind, node in enumerate(graph.nodes)}
+    labels = [f"{node.classroom.class_name}\nT{node.timeslot}" for node in graph.nodes]
+    edges = [(index[u], index[v]) for u, v in graph.edges]
+    return labels, edges
+
+def save_graph_snapshot(labels, edges, day, positions=None):
+    """
+    Saves a graph snapshot from `graph_snapshot` as a PNG image.
+    matplotlib is imported here so that scheduling without rendering never loads it.
+
+    Args:
+        labels (list): Node labels, one per node.
+        edges (list): Edges as pairs of node indices.
         day (int): The current day, used in filename.
+        positions (np.ndarray): Optional node positions from `visualize.node_positions`, reused
+            across days; without them a spring layout is computed for this graph.
     """
+    import matplotlib.pyplot as plt
+
+    graph = nx.Graph()
+    graph.add_nodes_from(range(len(labels)))
+    graph.add_edges_from(edges)
+
     plt.figure(figsize=(8, 6))
-    pos = nx.spring_layout(graph, seed=1, k = 1)  # Layout for consistent positioning
+    if positions is not None:
+        pos = dict(enumerate(positions))
+    else:
+        pos = nx.spring_layout(graph, seed=1, k = 1)  # Layout for consistent positioning
 
     # Draw nodes
     nx.draw_networkx_nodes(graph, pos, node_size=500, node_color="skyblue")
@@ -57,11 +103,7 @@ def save_graph(graph, day):
     nx.draw_networkx_edges(graph, pos, edge_color="gray", width=2.5)
 
     # Draw labels: class name + timeslot
-    node_labels = {
-        node: f"{node.classroom.class_name}\nT{node.timeslot}"
-        for node in graph.nodes
-    }
-    nx.draw_networkx_labels(graph, pos, labels=node_labels, font_size=8)
+    nx.draw_networkx_labels(graph, pos, labels=dict(enumerate(labels)), font_size=8)
 
     plt.title(f"Graph - Day {day}")
     plt.axis('off')
@@ -69,71 +111,72 @@ def save_graph(graph, day):
     plt.savefig(f"graph_day_{day}.png", dpi=150)
     plt.close()
 
-def generate_timetable(G, class_slots, faculties, faculty_schedule):
+def save_graph(graph, day, positions=None):
+    """
+    Saves the current graph `G` as a PNG image.
+
+    Args:
+        graph (nx.Graph): The NetworkX graph to visualize.
+        day (int): The current day, used in filename.
+        positions (np.ndarray): Optional node positions, see `save_graph_snapshot`.
+    """
+    save_graph_snapshot(*graph_snapshot(graph), day, positions)
+
+def create_slots(classrooms):
+    """
+    Creates the class slots and slot graph for a set of classrooms.
+
+    Args:
+        classrooms (iterable): The Classroom objects to schedule.
+
+    Returns:
+        tuple: The slot graph and a dictionary mapping classrooms to lists of ClassSlots.
+    """
+    G = nx.Graph()
+    class_slots = {classroom: [ClassSlots(classroom, ind) for ind in range(1, 8)] for classroom in classrooms}
+    for classroom in class_slots.keys():
+        G.add_nodes_from(class_slots[classroom])
+    return G, class_slots
+
+def generate_timetable(G, class_slots, faculties, faculty_schedule, render=False, render_pool=None, engine="greedy",
+                       metrics=None):
     """
     Generates a timetable based on the provided data structures.
+    Scheduling is headless by default; graph images are only drawn when `render` is set.
 
     Args:
-        G (nx.Graph): The graph representing the schedule.
+        G (nx.Graph): The graph of the day's slots, rebuilt from the conflict engine each day.
         class_slots (dict): Dictionary mapping classrooms to lists of ClassSlots.
-        faculties (list): List of Faculty objects.
-        faculty_schedule (dict): Dictionary tracking faculty assignments per day.
+        faculties (list): List of Faculty objects, including every faculty member assigned to a classroom.
+        faculty_schedule (FacultySchedule): Tracks faculty classes per classroom per day.
+        render (bool): Whether to save a graph_day_N.png image of each day's graph.
+        render_pool (Executor): Optional process pool that draws the images in the background while
+            later days are scheduled. The call blocks until every render has finished, so the files
+            exist when it returns, and raises the error of any render that failed.
+        engine (str or SchedulerEngine): The engine name (see `engines.available_engines`) or an
+            engine instance, whose `report` holds the days used, free slots and runtime afterwards.
+        metrics (SchedulerObserver): Optional observer called after each day. SchedulerMetrics collects
+            per-day timings and counts of validity checks, rejections by rule and allocations.
+            Without it nothing is counted.
 
     Returns:
-        list: A list of daily schedules, where each schedule is a list of strings.
+        TimetableResult: The timetable as faculty and course id grids. Iterating it yields
+            the daily schedules as lists of strings, and `to_strings()` returns them all.
     """
-    timetable = []
-    day = 1
-
-    while is_hours_remaining(faculties):
-        day_schedule = [f"Day {day}"]
-        for class_slot in G.nodes():
-            for faculty in class_slot.classroom.assigned_faculty.keys():
-                if is_valid_slot_for_faculty(faculty, class_slot, day, faculty_schedule, G):
-                    class_slot.allocate(faculty)
-                    faculty.assigned_classes[class_slot.classroom][1] -= 1
-                    faculty_schedule[faculty][class_slot.classroom].append(day)
-                    for classroom in faculty.assigned_classes.keys():
-                        if classroom.class_name != class_slot.classroom.class_name:
-                            G.add_edge(class_slot, class_slots[classroom][class_slot.timeslot - 1])
-                    break
-
-        # Collect timetable data for this day
-        for classroom in class_slots.keys():
-            slots = [slot.faculty.name if slot.faculty else 'free' for slot in class_slots[classroom]]
-            day_schedule.append(f"{str(classroom)}: {', '.join(slots)}")
-        timetable.append(day_schedule)
-
-        # Reset for next day
-        save_graph(G, day)
-        G.clear()  # Clear the graph instead of reinitializing to preserve object reference
-        for classroom in class_slots.keys():
-            class_slots[classroom] = [ClassSlots(classroom, ind) for ind in range(1, 8)]
-            G.add_nodes_from(class_slots[classroom])
-        day += 1
-
-    return timetable
+    from engines import get_engine  # engines import this module
 
-# Example usage
-if __name__ == "__main__":
+    if isinstance(engine, str):
+        engine = get_engine(engine)
+    return engine.schedule(G, class_slots, faculties, faculty_schedule, render=render, render_pool=render_pool,
+                           metrics=metrics)
+
+def example_data():
+    """ Builds the example classrooms and faculty used by the demo."""
     # Initialize classrooms
     cse_a = Classroom("CSE_A")
     cse_b = Classroom("CSE_B")
     cse_c = Classroom("CSE_C")
 
-    # Initialize graph
-    G = nx.Graph()
-
-    # Create class slots for each classroom
-    class_slots = {
-        cse_a: [ClassSlots(cse_a, ind) for ind in range(1, 8)],
-        cse_b: [ClassSlots(cse_b, ind) for ind in range(1, 8)],
-        cse_c: [ClassSlots(cse_c, ind) for ind in range(1, 8)]
-    }
-
-    for classroom in class_slots.keys():
-        G.add_nodes_from(class_slots[classroom])
-
     # Initialize courses
     daa = Course("DAA", "CSE101", 4)
     pfl = Course("PFL", "CSE102", 4)
@@ -165,18 +208,120 @@ if __name__ == "__main__":
     tierno = Faculty("Tierno")
     tierno.add_classes(classrooms={cse_c: maths})
 
-    courses = [daa, pfl, eee, os, maths]
+    classrooms = [cse_a, cse_b, cse_c]
     faculties = [ramu, ash, brock, delia, oak, harry, iris, blaine, misty, max, tierno]
+    return classrooms, faculties
+
+# Example usage
+if __name__ == "__main__":
+    from engines import available_engines, get_engine
+
+    parser = argparse.ArgumentParser(description="Generate the example timetable.")
+    parser.add_argument("--engine", choices=available_engines(), default="greedy", help="scheduling engine to use")
+    parser.add_argument("--compare", action="store_true", help="run every engine and print their reports")
+    parser.add_argument("--starts", type=int, default=1, help="run this many randomised starts and keep the best timetable")
+    parser.add_argument("--time-limit", type=float, default=None, help="stop starting new runs after this many seconds")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --starts or --components (default: CPU count)")
+    parser.add_argument("--components", action="store_true", help="schedule independent faculty/classroom clusters in parallel")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a single randomised run, or the base seed for --starts")
+    parser.add_argument("--render", action="store_true", help="save a graph_day_N.png image for each day")
+    parser.add_argument("--render-workers", type=int, default=0, help="draw images in this many background processes")
+    parser.add_argument("--metrics", action="store_true", help="print per-day timings and validity-check counts")
+    parser.add_argument("--profile", default=None, metavar="FILE", help="run under cProfile and dump the stats to FILE")
+    parser.add_argument("--improve", type=float, default=None, metavar="SECONDS",
+                        help="compact the timetable with local search for this many seconds "
+                             "(with --weeks: to fit the week, default 1, 0 turns it off)")
+    parser.add_argument("--weeks", type=int, default=None, help="solve one week and repeat it over a term of this many weeks")
+    parser.add_argument("--week-days", type=int, default=5, help="teaching days per week with --weeks")
+    args = parser.parse_args()
+
+    if args.compare:
+        for name in available_engines():
+            classrooms, faculties = example_data()
+            G, class_slots = create_slots(classrooms)
+            engine = get_engine(name)
+            generate_timetable(G, class_slots, faculties, FacultySchedule(), engine=engine)
+            print(engine.report)
+        raise SystemExit
+
+    classrooms, faculties = example_data()
+
+    if args.starts > 1:
+        from multistart import multistart
+
+        result = multistart(classrooms, faculties, engine=args.engine, iterations=args.starts,
+                            time_limit=args.time_limit, workers=args.workers, base_seed=args.seed or 0)
+        for day_data in result.timetable:
+            for line in day_data:
+                print(line)
+            print()
+        print(result)
+        raise SystemExit
+
+    if args.weeks:
+        from weekly import weekly_timetable
+
+        try:
+            timetable, report = weekly_timetable(classrooms, faculties, args.weeks, week_days=args.week_days,
+                                                 engine=args.engine, seed=args.seed, improve=args.improve)
+        except ValueError as error:
+            raise SystemExit(str(error))
+        for day_data in timetable:
+            for line in day_data:
+                print(line)
+            print()
+        print(report)
+        raise SystemExit
+
+    if args.components:
+        from components import schedule_components
+
+        timetable, report = schedule_components(classrooms, faculties, engine=args.engine, workers=args.workers, seed=args.seed)
+        for day_data in timetable:
+            for line in day_data:
+                print(line)
+            print()
+        print(report)
+        raise SystemExit
+
+    # Initialize graph and class slots
+    G, class_slots = create_slots(classrooms)
 
     # Initialize faculty schedule
-    faculty_schedule = {faculty: {classroom: [] for classroom in faculty.assigned_classes.keys()} for faculty in faculties}
+    faculty_schedule = FacultySchedule()
+
+    from SchedulerMetrics import SchedulerMetrics
+    from profiling import profiled, top_functions
+
+    metrics = SchedulerMetrics() if args.metrics else None
 
     # Generate timetable
-    timetable = generate_timetable(G, class_slots, faculties, faculty_schedule)
+    with profiled(args.profile, enabled=args.profile is not None) as profile:
+        if args.render and args.render_workers > 0:
+            with ProcessPoolExecutor(max_workers=args.render_workers) as pool:
+                timetable = generate_timetable(G, class_slots, faculties, faculty_schedule, render=True, render_pool=pool,
+                                               engine=get_engine(args.engine, seed=args.seed), metrics=metrics)
+        else:
+            timetable = generate_timetable(G, class_slots, faculties, faculty_schedule, render=args.render,
+                                           engine=get_engine(args.engine, seed=args.seed), metrics=metrics)
 
-    print(timetable)
+    if args.improve:
+        from optimize import improve_timetable, free_periods
+
+        before = (timetable.days, timetable.free_slots, free_periods(timetable))
+        timetable = improve_timetable(timetable, time_limit=args.improve, seed=args.seed)
+        after = (timetable.days, timetable.free_slots, free_periods(timetable))
+        print("Improved from {} days, {} free slots, {} free periods to {} days, {} free slots, {} free periods".format(*before, *after))
+
+    print(timetable.to_strings())
     # Print the timetable
     for day_data in timetable:
         for line in day_data:
             print(line)
-        print()
\ No newline at end of file
+        print()
+
+    if metrics is not None:
+        print(metrics)
+    if profile is not None:
+        print(top_functions(profile))
+        print(f"Profile written to {args.profile}")
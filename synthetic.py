@@ -0,0 +1,121 @@
+import argparse
+import json
+import random
+
+from Faculty import Faculty
+from Classroom import Classroom
+from Course import Course
+
+
+def generate_instance(classrooms=10, faculty=None, courses=None, hours=(3, 4), courses_per_classroom=5,
+                      shared=0.3, classes_per_shared=3, seed=0):
+    """
+    Generates a synthetic institution for testing and benchmarking.
+    Every classroom takes `courses_per_classroom` different courses, each taught by one
+    faculty member. Dedicated faculty teach a single class; shared faculty teach in
+    several classrooms, like lecturers serving more than one section.
+
+    Args:
+        classrooms (int): The number of classrooms.
+        faculty (int): The number of faculty (default: enough for `classes_per_shared` classes per shared member).
+        courses (int): The size of the course catalogue (default: twice `courses_per_classroom`).
+        hours (tuple): The (min, max) weekly hours of a course.
+        courses_per_classroom (int): The courses each classroom takes.
+        shared (float): The share of faculty teaching in more than one classroom, from 0 to 1.
+        classes_per_shared (int): Classes per shared faculty member when `faculty` is not given.
+        seed (int): The random seed; the same arguments always give the same instance.
+
+    Returns:
+        tuple: The Classroom objects and the Faculty objects with their assigned classes,
+            in the form returned by `simple_scheduler.example_data`.
+
+    Raises:
+        ValueError: If the numbers cannot be satisfied.
+    """
+    rng = random.Random(seed)
+    courses = courses or courses_per_classroom * 2
+    if courses_per_classroom > courses:
+        raise ValueError(f"Each classroom takes {courses_per_classroom} courses but the catalogue has only {courses}.")
+    pairs = classrooms * courses_per_classroom
+    if faculty is None:
+        faculty = max(1, round(pairs / (shared * classes_per_shared + 1 - shared)))
+    shared_count = round(shared * faculty)
+    dedicated_count = faculty - shared_count
+    if dedicated_count > pairs or (shared_count and pairs - dedicated_count < 2 * shared_count):
+        raise ValueError(f"{faculty} faculty with {shared:.0%} shared cannot cover {pairs} classes "
+                         f"with every shared member teaching at least two.")
+    if not shared_count and dedicated_count < pairs:
+        raise ValueError(f"{faculty} dedicated faculty cannot cover {pairs} classes; raise `faculty` or `shared`.")
+
+    catalogue = [Course(f"Course {ind + 1}", f"C{ind + 1:04d}", rng.randint(*hours)) for ind in range(courses)]
+    rooms = [Classroom(f"R{ind + 1:04d}") for ind in range(classrooms)]
+    classes = [(room, course) for room in rooms for course in rng.sample(catalogue, courses_per_classroom)]
+
+    # Dedicated faculty take random classes; shared faculty deal out the rest in classroom order
+    dedicated = set(rng.sample(range(pairs), dedicated_count))
+    faculties = [Faculty(f"F{ind + 1:05d}") for ind in range(faculty)]
+    teachers = iter(faculties[shared_count:])
+    for ind in sorted(dedicated):
+        room, course = classes[ind]
+        next(teachers).add_classes(classrooms={room: course})
+    turn = 0
+    for ind in range(pairs):
+        if ind in dedicated:
+            continue
+        room, course = classes[ind]
+        for attempt in range(shared_count):
+            teacher = faculties[(turn + attempt) % shared_count]
+            if room not in teacher.assigned_classes:
+                teacher.add_classes(classrooms={room: course})
+                break
+        else:
+            raise ValueError(f"Not enough shared faculty for classroom {room.class_name}; raise `shared` or `faculty`.")
+        turn += 1
+    return rooms, [teacher for teacher in faculties if teacher.assigned_classes]
+
+
+def to_records(classrooms, faculties):
+    """
+    Converts classrooms and faculty into table rows for `SchedulerDB.bulk_insert` or a JSON import file.
+
+    Returns:
+        dict: Row tuples keyed by table, as in `importer.TABLES`.
+    """
+    courses = {}
+    assignments = []
+    for faculty in faculties:
+        for classroom, (course, _) in faculty.assigned_classes.items():
+            courses.setdefault(course.code, (course.code, course.name, course.course_hours))
+            assignments.append((faculty.name, classroom.class_name, course.code))
+    return {
+        "classrooms": [(classroom.class_name,) for classroom in classrooms],
+        "courses": list(courses.values()),
+        "faculty": [(faculty.name,) for faculty in faculties],
+        "assignments": assignments,
+    }
+
+
+if __name__ == "__main__":
+    from importer import TABLES
+
+    parser = argparse.ArgumentParser(description="Write a synthetic institution as a JSON import file.")
+    parser.add_argument("out", help="the .json file to write")
+    parser.add_argument("--classrooms", type=int, default=10)
+    parser.add_argument("--faculty", type=int, default=None)
+    parser.add_argument("--courses", type=int, default=None)
+    parser.add_argument("--hours", type=int, nargs=2, default=(3, 4), metavar=("MIN", "MAX"))
+    parser.add_argument("--courses-per-classroom", type=int, default=5)
+    parser.add_argument("--shared", type=float, default=0.3, help="share of faculty teaching in several classrooms")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        classrooms, faculties = generate_instance(args.classrooms, args.faculty, args.courses, tuple(args.hours),
+                                                  args.courses_per_classroom, args.shared, seed=args.seed)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    records = to_records(classrooms, faculties)
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump({table: [dict(zip(TABLES[table], row)) for row in rows] for table, rows in records.items()}, file)
+    print(f"Wrote {len(classrooms)} classrooms, {len(records['courses'])} courses, {len(faculties)} faculty "
+          f"and {len(records['assignments'])} assignments to {args.out}")
@@ -0,0 +1,21 @@
+import unittest
+
+from multistart import multistart, run_seed
+from simple_scheduler import example_data
+
+
+class MultistartTest(unittest.TestCase):
+    """ Runs the multi-start search on the example data."""
+
+    def test_expired_time_limit_still_returns_the_first_run(self):
+        # The first run uses the engine's default order, like a single run
+        expected, _ = run_seed(*example_data())
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                result = multistart(*example_data(), iterations=4, time_limit=0, workers=workers)
+                self.assertEqual(result.runs, 1)
+                self.assertIsNone(result.seed)
+                self.assertEqual(result.timetable.cells.tolist(), expected.cells.tolist())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from SchedulerDB import SchedulerDB
+from service import SchedulerService, ServiceError
+
+
+def make_db(path):
+    """ Writes a small department with three classrooms sharing faculty to `path`."""
+    db = SchedulerDB(path)
+    db.bulk_insert(
+        classrooms=[("CSE_A",), ("CSE_B",), ("CSE_C",)],
+        courses=[("CS101", "Programming", 4), ("CS102", "Data Structures", 3), ("MA101", "Calculus", 4)],
+        faculty=[("Ash",), ("Brock",), ("Misty",)],
+        assignments=[("Ash", "CSE_A", "CS101"), ("Ash", "CSE_B", "CS101"), ("Brock", "CSE_A", "CS102"),
+                     ("Brock", "CSE_C", "CS102"), ("Misty", "CSE_B", "MA101"), ("Misty", "CSE_C", "MA101")],
+    )
+    db.close()
+
+
+class SchedulerServiceTest(unittest.IsolatedAsyncioTestCase):
+    """ Drives the service offline: a temporary SQLite file and workers in threads of this process."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "scheduler.db")
+        make_db(self.db_path)
+        self.service = SchedulerService(self.db_path, workers=1, executor=ThreadPoolExecutor(1))
+        await self.service.start(port=None)
+
+    async def asyncTearDown(self):
+        await self.service.close()
+        self.tmp.cleanup()
+
+    async def poll(self, job, timeout=30):
+        # Polls the job's status like a client of GET /jobs/<id>
+        for _ in range(int(timeout / 0.01)):
+            status = self.service.get_job(job.id).to_dict()["status"]
+            if status in ("done", "error"):
+                return status
+            await asyncio.sleep(0.01)
+        self.fail(f"job {job.id} did not finish")
+
+    async def test_identical_jobs_are_merged(self):
+        first = self.service.submit({"engine": "greedy", "seed": 3})
+        second = self.service.submit({"seed": 3})
+        other = self.service.submit({"seed": 4})
+        self.assertIs(first, second)
+        self.assertEqual(first.requests, 2)
+        self.assertIsNot(first, other)
+        self.assertEqual(await self.poll(first), "done")
+        self.assertEqual(await self.poll(other), "done")
+
+    async def test_poll_and_result(self):
+        job = self.service.submit({})
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(await self.poll(job), "done")
+
+        reply = await self.request(f"/jobs/{job.id}/result")
+        self.assertEqual(reply["status"], "done")
+        timetable = reply["timetable"]
+        self.assertEqual(timetable["class_names"], ["CSE_A", "CSE_B", "CSE_C"])
+        self.assertEqual(len(timetable["cells"]), reply["days"])
+        taught = sum(cell != -1 for day in timetable["cells"] for row in day for cell in row)
+        self.assertEqual(taught, 2 * (4 + 3 + 4))
+
+    async def test_finished_runs_come_from_the_cache(self):
+        job = self.service.submit({})
+        await self.poll(job)
+        again = self.service.submit({})
+        self.assertIsNot(again, job)
+        self.assertTrue(again.cached)
+        self.assertEqual(again.status, "done")
+        self.assertEqual(again.timetable.cells.tolist(), job.timetable.cells.tolist())
+
+        # A change to the file from another connection is picked up by the next job
+        db = SchedulerDB(self.db_path)
+        db.add_course("CS103", "Networks", 2)
+        db.assign("Ash", "CSE_C", "CS103")
+        db.close()
+        changed = self.service.submit({})
+        self.assertFalse(changed.cached)
+        self.assertEqual(await self.poll(changed), "done")
+
+    async def test_cache_errors_do_not_stop_the_workers(self):
+        def locked(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        self.service.cache.put = locked
+        first = self.service.submit({"seed": 1})
+        second = self.service.submit({"seed": 2})
+        self.assertEqual(await self.poll(first), "done")
+        self.assertEqual(await self.poll(second), "done")
+        self.assertFalse(any(task.done() for task in self.service.dispatchers))
+
+    async def test_invalid_settings(self):
+        with self.assertRaises(ServiceError) as error:
+            self.service.submit({"engine": "nope"})
+        self.assertEqual(error.exception.status, 400)
+        with self.assertRaises(ServiceError):
+            self.service.submit({"weeks": 0})
+
+    async def request(self, path):
+        # Sends GET `path` through the request handler, as the HTTP server would
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+        reader.feed_eof()
+        writer = _Writer()
+        await self.service.handle(reader, writer)
+        head, _, body = bytes(writer.data).partition(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"HTTP/1.1 200"), head)
+        return json.loads(body)
+
+
+class _Writer:
+    """ Collects what the handler writes to a connection."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data.extend(data)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,297 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+import networkx as nx
+import numpy as np
+
+from SlotGrid import FREE
+from WeeklyTimetable import WeeklyTimetable
+
+FORMATS = ("svg", "png")
+LAYOUTS = ("spring", "grid")
+# Classrooms from which the spring layout falls back to the grid
+SPRING_LIMIT = 500
+# Node positions by classroom set and layout, most recently used last
+MAX_LAYOUTS = 16
+_layouts = {}
+
+# Timetable, positions, labels and faculty classrooms for the current worker process
+_worker_state = None
+
+
+def faculty_classrooms(timetable):
+    """
+    Finds the classrooms each faculty member teaches in.
+
+    Args:
+        timetable (TimetableResult): The timetable (a WeeklyTimetable is read from its week).
+
+    Returns:
+        dict: Sorted arrays of classroom ids keyed by faculty id.
+    """
+    cells = _grids(timetable).cells
+    days, classroom_ids, slots = np.nonzero(cells != FREE)
+    pairs = np.unique(np.stack([cells[days, classroom_ids, slots], classroom_ids], axis=1), axis=0)
+    faculty_ids, starts = np.unique(pairs[:, 0], return_index=True)
+    return dict(zip(faculty_ids.tolist(), np.split(pairs[:, 1], starts[1:])))
+
+
+def classroom_pairs(groups):
+    """ Returns every pair of classrooms that share a faculty member, given each member's classroom ids."""
+    pairs = set()
+    for classrooms in groups:
+        classrooms = sorted(classrooms)
+        pairs.update((a, b) for ind, a in enumerate(classrooms) for b in classrooms[ind + 1:])
+    return sorted(pairs)
+
+
+def node_positions(class_names, slots_per_day=7, pairs=(), layout="spring"):
+    """
+    Returns the drawing positions of every slot node, computed once per classroom set.
+    Node `classroom id * slots_per_day + slot` is a classroom's slot, as in `graph_snapshot`.
+    Each classroom's slots are drawn as a short column. The spring layout pulls together
+    classrooms that share faculty, so the slots that can conflict are close, and every day of
+    a term is drawn on the same positions.
+
+    Args:
+        class_names (list): The classroom names, in classroom id order.
+        slots_per_day (int): The number of slots per day.
+        pairs (list): (classroom id, classroom id) pairs that share faculty, see `classroom_pairs`.
+        layout (str): "spring", or "grid" for classrooms in a square grid. Institutions with
+            `SPRING_LIMIT` classrooms or more always use the grid, as networkx needs scipy
+            for larger spring layouts.
+
+    Returns:
+        np.ndarray: Node positions, shaped nodes x 2.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}'. Use one of: {', '.join(LAYOUTS)}")
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    key = (tuple(class_names), slots_per_day, layout, pairs.tobytes())
+    if key in _layouts:
+        _layouts[key] = _layouts.pop(key)
+        return _layouts[key]
+
+    count = len(class_names)
+    if layout == "spring" and 1 < count < SPRING_LIMIT:
+        graph = nx.Graph()
+        graph.add_nodes_from(range(count))
+        graph.add_edges_from(pairs.tolist())
+        layout_positions = nx.spring_layout(graph, seed=1)
+        centres = np.array([layout_positions[classroom_id] for classroom_id in range(count)], dtype=float)
+        spacing = 2 / np.sqrt(count)
+    else:
+        columns = max(1, int(np.ceil(np.sqrt(count))))
+        rows, cols = np.divmod(np.arange(count), columns)
+        centres = np.stack([cols, -rows], axis=1).astype(float)
+        spacing = 1.0
+    # Slot 1 at the top of each classroom's column
+    offsets = np.zeros((slots_per_day, 2))
+    offsets[:, 1] = -(np.arange(slots_per_day) - (slots_per_day - 1) / 2) * spacing * 0.8 / slots_per_day
+    positions = (centres[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+
+    _layouts[key] = positions
+    while len(_layouts) > MAX_LAYOUTS:
+        del _layouts[next(iter(_layouts))]
+    return positions
+
+
+def node_labels(class_names, slots_per_day=7):
+    """ Returns the "CLASS\\nT1" label of every slot node."""
+    return [f"{name}\nT{slot}" for name in class_names for slot in range(1, slots_per_day + 1)]
+
+
+def day_edges(timetable, day, classrooms_of):
+    """
+    Returns a day's conflict edges: each taught slot is joined to the same timeslot in the
+    other classrooms of its faculty member, as `ConflictEngine.add_edges` does.
+
+    Args:
+        timetable (TimetableResult): The timetable.
+        day (int): The day number, from 1.
+        classrooms_of (dict): The result of `faculty_classrooms`.
+
+    Returns:
+        np.ndarray: Unique (node, node) pairs, shaped edges x 2.
+    """
+    cells = timetable.day_cells(day - 1)
+    slots_per_day = cells.shape[1]
+    edges = []
+    for classroom_id, slot in np.argwhere(cells != FREE).tolist():
+        others = classrooms_of[int(cells[classroom_id, slot])]
+        others = others[others != classroom_id]
+        if len(others):
+            node = classroom_id * slots_per_day + slot
+            edges.append(np.stack([np.full(len(others), node), others * slots_per_day + slot], axis=1))
+    if not edges:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.sort(np.concatenate(edges), axis=1), axis=0)
+
+
+def write_svg(path, labels, positions, edges, title, size=800):
+    """
+    Writes a graph as a plain SVG file, without matplotlib.
+
+    Args:
+        path (str): The output file.
+        labels (list): Node labels; line breaks become separate text lines.
+        positions (np.ndarray): Node positions from `node_positions`.
+        edges (np.ndarray): (node, node) pairs.
+        title (str): The title drawn above the graph.
+        size (int): The width and height of the drawing area in pixels.
+    """
+    margin = 40
+    low = positions.min(axis=0) if len(positions) else np.zeros(2)
+    span = np.ptp(positions, axis=0) if len(positions) else np.ones(2)
+    scale = (size - 2 * margin) / max(float(span.max()), 1e-9)
+    points = (positions - low) * scale + margin
+    points[:, 1] = size - points[:, 1] + 30  # SVG y grows downwards; leave room for the title
+    radius = max(2.0, min(12.0, size / (3 * max(1, np.sqrt(len(points))))))
+    font = radius * 0.8
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size + 30}" '
+             f'viewBox="0 0 {size} {size + 30}" font-family="sans-serif">',
+             f'<text x="{size / 2:.0f}" y="24" font-size="16" text-anchor="middle">{escape(title)}</text>',
+             '<g stroke="gray" stroke-width="1.5">']
+    parts.extend(f'<line x1="{points[a, 0]:.1f}" y1="{points[a, 1]:.1f}" x2="{points[b, 0]:.1f}" y2="{points[b, 1]:.1f}"/>'
+                 for a, b in edges.tolist())
+    parts.append('</g><g fill="skyblue">')
+    parts.extend(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius:.1f}"/>' for x, y in points.tolist())
+    parts.append(f'</g><g font-size="{font:.1f}" text-anchor="middle">')
+    for (x, y), label in zip(points.tolist(), labels):
+        lines = label.split("\n")
+        spans = "".join(f'<tspan x="{x:.1f}" dy="{0 if ind == 0 else font:.1f}">{escape(line)}</tspan>'
+                        for ind, line in enumerate(lines))
+        parts.append(f'<text y="{y - font * (len(lines) - 1) / 2 + font * 0.35:.1f}">{spans}</text>')
+    parts.append('</g></svg>\n')
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(parts))
+
+
+def write_png(path, labels, positions, edges, title):
+    """ Writes a graph as a PNG image with matplotlib, reusing one figure per process."""
+    import matplotlib.pyplot as plt
+
+    figure = plt.figure("schedulit-graph", figsize=(8, 6))
+    figure.clf()
+    axes = figure.add_subplot()
+    pos = dict(enumerate(positions))
+    graph = nx.Graph()
+    graph.add_nodes_from(range(len(labels)))
+    graph.add_edges_from(edges.tolist())
+    nx.draw_networkx_nodes(graph, pos, node_size=500, node_color="skyblue", ax=axes)
+    nx.draw_networkx_edges(graph, pos, edge_color="gray", width=2.5, ax=axes)
+    nx.draw_networkx_labels(graph, pos, labels=dict(enumerate(labels)), font_size=8, ax=axes)
+    axes.set_title(title)
+    axes.axis('off')
+    figure.tight_layout()
+    figure.savefig(path, dpi=150)
+
+
+WRITERS = {"svg": write_svg, "png": write_png}
+
+
+def _grids(timetable):
+    return timetable.week if isinstance(timetable, WeeklyTimetable) else timetable
+
+
+def _render_day(state, fmt, day, path):
+    timetable, positions, labels, classrooms_of = state
+    WRITERS[fmt](path, labels, positions, day_edges(timetable, day, classrooms_of), f"Graph - Day {day}")
+    return path
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def _render_worker(fmt, day, path):
+    return _render_day(_worker_state, fmt, day, path)
+
+
+def render_days(timetable, days=None, out_dir=".", fmt="svg", layout="spring", workers=None):
+    """
+    Draws the conflict graphs of chosen days of a timetable, as `graph_day_N.svg` or `.png` files.
+    The node positions are computed once for the classroom set and reused for every day,
+    and only the requested days are drawn. With `workers`, days are drawn in parallel processes.
+
+    Args:
+        timetable (TimetableResult): The timetable, or a WeeklyTimetable.
+        days (iterable): Day numbers from 1 (default: every day).
+        out_dir (str): The directory for the images.
+        fmt (str): "svg" (fast, no matplotlib) or "png".
+        layout (str): "spring" or "grid", see `node_positions`.
+        workers (int): Optional number of worker processes.
+
+    Returns:
+        list: The paths written, in day order.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown image format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    days = list(range(1, timetable.days + 1)) if days is None else sorted(set(days))
+    if days and not 1 <= days[0] <= days[-1] <= timetable.days:
+        raise ValueError(f"Days must be between 1 and {timetable.days}.")
+    classrooms_of = faculty_classrooms(timetable)
+    slots_per_day = timetable.slots_per_day
+    positions = node_positions(timetable.class_names, slots_per_day, classroom_pairs(classrooms_of.values()), layout)
+    state = (timetable, positions, node_labels(timetable.class_names, slots_per_day), classrooms_of)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = [os.path.join(out_dir, f"graph_day_{day}.{fmt}") for day in days]
+    if not workers or workers <= 1 or len(days) <= 1:
+        return [_render_day(state, fmt, day, path) for day, path in zip(days, paths)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as pool:
+        return list(pool.map(_render_worker, [fmt] * len(days), days, paths))
+
+
+def parse_days(text):
+    """ Parses day numbers like "1-5,8,10"."""
+    days = []
+    for part in text.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            days.extend(range(int(first), int(last or first) + 1))
+        except ValueError:
+            raise ValueError(f"'{part}' is not a day or a range of days like 3-7.")
+    return days
+
+
+if __name__ == "__main__":
+    from SchedulerDB import SchedulerDB
+    from TimetableCache import TimetableCache
+    from engines import available_engines, DEFAULT_ENGINE
+    from multistart import run_seed
+
+    parser = argparse.ArgumentParser(description="Draw the daily conflict graphs of a database's timetable.")
+    parser.add_argument("--db", default="scheduler.db", help="the scheduler database")
+    parser.add_argument("--engine", choices=available_engines(), default=DEFAULT_ENGINE, help="scheduling engine to use")
+    parser.add_argument("--days", default=None, help="days to draw, e.g. 1-5,8 (default: all)")
+    parser.add_argument("--format", choices=FORMATS, default="svg", help="image format")
+    parser.add_argument("--layout", choices=LAYOUTS, default="spring", help="node layout")
+    parser.add_argument("--out", default="graphs", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+
+    db = SchedulerDB(args.db)
+    classroom_map, _, faculty_map = db.load()
+    classrooms, faculties = list(classroom_map.values()), list(faculty_map.values())
+    cache = TimetableCache(db.conn)
+    key = TimetableCache.key(classrooms, faculties, engine=args.engine)
+    cached = cache.get(key)
+    if cached:
+        timetable = cached[0]
+    else:
+        timetable, report = run_seed(classrooms, faculties, args.engine)
+        cache.put(key, timetable, report, settings=args.engine)
+    db.close()
+
+    start = time.perf_counter()
+    try:
+        paths = render_days(timetable, parse_days(args.days) if args.days else None, args.out, args.format,
+                            args.layout, args.workers)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    print(f"Drew {len(paths)} of {timetable.days} days to {args.out} in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+
+from SchedulerEngine import EngineReport
+from SlotGrid import FREE
+from TimetableResult import TimetableResult
+from WeeklyTimetable import WeeklyTimetable
+from multistart import run_seed
+from optimize import improve_timetable
+from serialize import dump_models, load_models
+
+DEFAULT_IMPROVE = 1.0  # Seconds of local search for weeks the engine spreads over too many days
+
+
+def weekly_hours(course_hours, weeks):
+    """ Returns the classes a week needs for a course to get its term hours, rounding up."""
+    return -(-course_hours // weeks)
+
+
+def taught_weeks(week, weeks, term_hours):
+    """
+    Finds how many weeks each class of a repeated week is taught, so every course gets exactly
+    its term hours. A course that needs fewer than `weekly_hours` x `weeks` classes drops its
+    last classes of the week in the final weeks of the term.
+
+    Args:
+        week (TimetableResult): The solved week.
+        weeks (int): The number of weeks in the term.
+        term_hours (dict): Term hours keyed by (classroom name, faculty name, course code).
+
+    Returns:
+        np.ndarray: Weeks taught per week cell, shaped like `week.cells`.
+    """
+    taught = np.full(week.cells.shape, weeks, dtype=np.int32)
+    classes = {}
+    for day, classroom_id, slot in np.argwhere(week.cells != FREE).tolist():
+        key = (classroom_id, int(week.cells[day, classroom_id, slot]), int(week.course_cells[day, classroom_id, slot]))
+        classes.setdefault(key, []).append((day, slot))
+    for (classroom_id, faculty_id, course_id), cells in classes.items():
+        hours = term_hours.get((week.class_names[classroom_id], week.faculty_names[faculty_id],
+                                week.course_codes[course_id] if course_id != FREE else None))
+        surplus = len(cells) * weeks - hours if hours is not None else 0
+        for day, slot in reversed(cells):
+            if surplus <= 0:
+                break
+            dropped = min(surplus, weeks)
+            taught[day, classroom_id, slot] = weeks - dropped
+            surplus -= dropped
+    return taught
+
+
+def weekly_timetable(classrooms, faculties, weeks, week_days=5, engine="greedy", seed=None, improve=None):
+    """
+    Schedules a term that repeats the same week.
+    Each course's `course_hours` over the term becomes `weekly_hours` classes a week, only
+    one `week_days`-day week is solved, and the result repeats it for every week of the term.
+    Solve time and memory therefore do not depend on the term length. The daily limits of
+    `is_valid_slot_for_faculty` apply to the week, so a faculty/classroom pair may have one
+    day with more than one class every week. Weekly hours are rounded up, and the surplus
+    classes are left free in the final weeks (see `taught_weeks`), so every course is taught
+    exactly its `course_hours`.
+
+    Args:
+        classrooms (list): The Classroom objects to schedule. They are not modified.
+        faculties (list): The Faculty objects with their assigned classes. They are not modified.
+        weeks (int): The number of weeks in the term.
+        week_days (int): The teaching days in a week.
+        engine (str): The engine name.
+        seed (int): Optional seed for the engine and the compaction.
+        improve (float): Seconds of local search (see `optimize`) to spend fitting a week the
+            engine spreads over more than `week_days` days; None uses `DEFAULT_IMPROVE` and 0 turns it off.
+
+    Returns:
+        tuple: The WeeklyTimetable and an EngineReport for the term.
+
+    Raises:
+        ValueError: If the weekly classes do not fit into `week_days` days.
+    """
+    if weeks < 1 or week_days < 1:
+        raise ValueError("A term needs at least one week of at least one day.")
+    improve = DEFAULT_IMPROVE if improve is None else improve
+    start = time.perf_counter()
+    week_classrooms, week_faculties = load_models(dump_models(classrooms, faculties))
+    for faculty in week_faculties:
+        for assignment in faculty.assigned_classes.values():
+            assignment[1] = weekly_hours(assignment[0].course_hours, weeks)
+        faculty.remaining_hours = sum(hours for _, hours in faculty.assigned_classes.values())
+
+    week, report = run_seed(week_classrooms, week_faculties, engine, seed)
+    if week.days > week_days and improve > 0:
+        week = improve_timetable(week, time_limit=improve, seed=seed)
+    if week.days > week_days:
+        raise ValueError(f"The weekly classes need {week.days} days but the week has {week_days}. "
+                         f"Spread the term over more weeks or teach more days a week.")
+
+    # Days the week leaves empty stay free
+    padding = np.full((week_days - week.days, len(week.class_names), week.slots_per_day), FREE, dtype=np.int32)
+    week = TimetableResult(np.concatenate([week.cells, padding]), np.concatenate([week.course_cells, padding]),
+                           week.class_names, week.faculty_names, week.course_codes, week.course_names)
+    term_hours = {
+        (classroom.class_name, faculty.name, course.code): course.course_hours
+        for faculty in faculties for classroom, (course, _) in faculty.assigned_classes.items()
+    }
+    timetable = WeeklyTimetable(week, weeks, taught_weeks(week, weeks, term_hours))
+    return timetable, EngineReport(report.engine, timetable.days, timetable.free_slots, time.perf_counter() - start)